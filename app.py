@@ -1,13 +1,25 @@
 import logging
 import dash
-import pandas as pd
-from datetime import datetime
-from typing import Any
-
-from dash import dcc, html, callback, Input, Output
-from utils.loading_data import load_data
+from typing import Any, Optional
+
+from dash import html, callback, Input, Output, State
+from utils.figure_cache import FIGURE_CACHE
+from utils.http_cache import init_http_cache
+from utils.lazy_imports import lazy_import
+from utils.metrics import init_metrics
+from utils.notifications import BROKER, init_notifications
+from utils.profiling import init_profiling
+from utils.serialisation import init_serialisation
+from utils.tracing import init_tracing, traced
+from utils.shared_cache import SHARED_CACHE
+from utils.single_flight import SINGLE_FLIGHT
 from config import CONFIG
 
+# Imported by the first callback (see pages/home.py)
+data_store = lazy_import('utils.data_store')
+loading_data = lazy_import('utils.loading_data')
+year_view = lazy_import('utils.year_view')
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s",
@@ -44,9 +56,26 @@ app = dash.Dash(
 
 server = app.server
 
+metrics_collectors = [
+    ('figure_cache', 'Figure cache statistics', FIGURE_CACHE.stats),
+    ('single_flight', 'Shared computations of this process', SINGLE_FLIGHT.stats),
+]
+if SHARED_CACHE is not None:
+    metrics_collectors.append(('shared_cache', 'Shared cache statistics of this process', SHARED_CACHE.stats))
+if CONFIG.NOTIFICATIONS_ENABLED:
+    metrics_collectors.append(('dataset_events', 'Dataset notifications of this process', BROKER.stats))
+init_metrics(app, metrics_collectors)
+init_profiling(app)
+init_http_cache(app)
+init_tracing(app)
+init_notifications(app)
+
+# Registered last, so that the hooks above see the compressed responses (Flask runs after_request hooks in reverse
+# order)
+init_serialisation(app)
+
 app.layout = html.Div(
     [
-        dcc.Store(id='drug-approvals-last-update'),
         dash.page_container
     ]
 )
@@ -58,35 +87,35 @@ app.layout = html.Div(
     Output('year-input', 'min'),
     Output('year-input', 'max'),
     Output('year-input', 'value'),
-    Input('drug-approvals-data', 'input')
+    Input('drug-approvals-data', 'input'),
+    State('year-input', 'value'),
+    # The server-rendered page already holds the data and the year bounds (see pages.home.render_initial_state)
+    prevent_initial_call=CONFIG.SERVER_RENDERED_LAYOUT
 )
-def load_drug_approvals_data(_: Any):
+@traced
+def load_drug_approvals_data(_: Any, year: Optional[int]):
     """
-    Loads drug approvals data from Google Cloud Storage (GCS) or locally if GCS is unreachable,
-    processes the data to extract the year of approval, and provides boundary years for inputs.
+    Loads drug approvals data from the process-wide dataset cache, where dates are already parsed and the
+    year of approval already derived, and provides boundary years for inputs.
 
     Args:
     _: This is a placeholder for the input argument which is not used in the function.
+    year: The year selected by the URL of the page (see pages.home.parse_view_state), None for the current year.
 
     Returns:
     Tuple containing:
-        - List of dictionaries representing the drug approvals data for storing in a dcc.Store.
+        - Content of the dcc.Store: a handle to the server-side snapshot, or the list of records
+          (see CONFIG.DATA_STORE_MODE).
+        - Last update date of the dataset file.
         - Minimum year of approval for setting the range of a year input slider.
         - Maximum year of approval for setting the range of a year input slider.
-        - Current year for setting the default value of a year input slider.
+        - Year selected by the URL, or the current year, for setting the default value of a year input slider.
     """
-    df, last_update = load_data('NEW_DRUG_APPROVALS_FILENAME', 'csv')
-
-    df['Date of Approval'] = pd.to_datetime(df['Date of Approval'], errors='coerce')
-    df['year'] = df['Date of Approval'].dt.year
-
-    year_boundaries = [
-        df['year'].min(),
-        df['year'].max(),
-        datetime.now().year
-    ]
+    snapshot = loading_data.get_snapshot('NEW_DRUG_APPROVALS_FILENAME', 'csv')
+    min_year, max_year, current_year = year_view.year_bounds(snapshot.data)
+    year_boundaries = [min_year, max_year, year if year is not None and min_year <= year <= max_year else current_year]
 
-    return df.to_dict('records'), last_update, *year_boundaries
+    return data_store.make_store_payload(snapshot), snapshot.last_update, *year_boundaries
 
 
 if __name__ == "__main__":
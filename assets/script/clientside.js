@@ -24,5 +24,31 @@ window.dash_clientside.clientside = {
                 return window.dash_clientside.no_update;
             }
             return !opened;
+    },
+
+    update_url_state: function(year, itemType, nCompanies) {
+        const params = new URLSearchParams(window.location.search);
+        const state = {year: year, item_type: itemType, n_companies: nCompanies};
+        Object.keys(state).forEach(function(name) {
+            if (state[name] === null || state[name] === undefined || state[name] === '') {
+                params.delete(name);
+            } else {
+                params.set(name, state[name]);
+            }
+        });
+        const query = params.toString();
+        window.history.replaceState(
+            window.history.state, '', window.location.pathname + (query ? '?' + query : '') + window.location.hash
+        );
+        return window.dash_clientside.no_update;
+    },
+
+    purge_infinite_grid: function(data, gridId) {
+        try {
+            window.dash_ag_grid.getApi(gridId).purgeInfiniteCache();
+        } catch (e) {
+            // The grid is not ready yet: it will request its first block by itself
+        }
+        return window.dash_clientside.no_update;
     }
 };
\ No newline at end of file
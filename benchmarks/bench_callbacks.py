@@ -0,0 +1,256 @@
+"""
+Benchmarks the server callbacks of the dashboard on datasets of increasing size.
+
+Each dataset is generated by benchmarks.synthetic_data and written to a temporary data directory, then the
+callbacks are called directly, in the order a page view triggers them. For every callback the suite reports the
+wall time of the first (cold) call and the median of the following (warm) calls, the peak memory allocated during
+the cold call, and the serialisation time and size (raw and compressed) of the response.
+
+Usage:
+    python -m benchmarks.bench_callbacks --sizes 2000 20000 200000 1000000
+    python -m benchmarks.bench_callbacks --compare benchmarks/results/a.json benchmarks/results/b.json
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Tuple
+
+import pandas as pd
+from plotly.io.json import to_json_plotly
+
+from benchmarks import synthetic_data
+from benchmarks.synthetic_data import DatasetProfile
+from config import CONFIG
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - Brotli sizes are not reported
+    brotli = None
+
+DEFAULT_SIZES = [2_000, 20_000, 200_000, 1_000_000]
+DEFAULT_YEAR = 2024
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+CallbackStep = Tuple[str, Callable[[], Any]]
+
+
+def import_app() -> ModuleType:
+    """
+    Imports the app, which registers the page callbacks and configures logging, and keeps only the warnings so
+    that the dataset loads do not flood the report.
+    """
+
+    import app
+
+    logging.getLogger().setLevel(logging.WARNING)
+    return app
+
+
+def callback_steps(year: int) -> List[CallbackStep]:
+    """
+    Returns the callbacks triggered by a page view followed by the usual interactions, as (name, call) pairs.
+    Each call receives the outputs of the previous ones through the `state` dictionary.
+    """
+
+    app = import_app()
+    from pages import home
+
+    state: Dict[str, Any] = {}
+
+    def load():
+        state['load'] = app.load_drug_approvals_data(None, None)
+        return state['load']
+
+    def year_view():
+        data, last_update = state['load'][0], state['load'][1]
+        state['year_view'] = home.update_drug_approvals_data(year, None, data, last_update)
+        return state['year_view']
+
+    def stacked():
+        return home.update_stacked_fig(state['year_view'][0], 'disease_type', 10)
+
+    def modal():
+        grid_rows = home.year_view.get_year_view(state['year_view'][0]).grid_rows
+        first_row = grid_rows[0] if grid_rows else {'drug_name': None, 'Date of Approval': None}
+        clicked = {'value': {'drugName': first_row['drug_name'], 'dateApproval': first_row['Date of Approval']}}
+        return home.toggle_modal_drug(clicked, False)
+
+    steps = [
+        ('load_drug_approvals_data', load),
+        ('update_drug_approvals_data', year_view),
+        ('update_stacked_fig', stacked),
+        ('toggle_modal_drug', modal),
+    ]
+
+    if hasattr(home, 'update_grid_rows_block'):
+        def grid_block():
+            request = {'startRow': 0, 'endRow': 50, 'sortModel': [{'colId': 'drug_name', 'sort': 'asc'}]}
+            return home.update_grid_rows_block(request, state['year_view'][0])
+        steps.append(('update_grid_rows_block', grid_block))
+
+    return steps
+
+
+def payload_stats(output: Any) -> Dict[str, Any]:
+    """
+    Serialises a callback output like Dash does, with plotly's JSON encoder (see CONFIG.JSON_ENGINE), and
+    compresses it at the levels used by the server (gzip 6, Brotli 4).
+    """
+
+    start = time.perf_counter()
+    payload = to_json_plotly(output).encode()
+    serialise = time.perf_counter() - start
+
+    return {
+        'serialise_s': serialise,
+        'payload_bytes': len(payload),
+        'gzip_bytes': len(gzip.compress(payload, compresslevel=6)),
+        'br_bytes': len(brotli.compress(payload, quality=4)) if brotli is not None else None,
+    }
+
+
+def write_dataset(profile: DatasetProfile, n_rows: int, seed: int, directory: str) -> None:
+    filepath = os.path.join(directory, CONFIG.FILENAME_MAPPING['NEW_DRUG_APPROVALS_FILENAME'])
+    synthetic_data.write_dataset(profile, filepath, n_rows, seed)
+
+
+def bench_size(profile: DatasetProfile, n_rows: int, year: int, repeat: int, seed: int) -> Dict[str, Any]:
+    """
+    Runs every callback on a dataset of n_rows approvals.
+
+    The cold calls of the timing pass run without tracemalloc. Peak memory is measured on a second cold pass,
+    over a dataset of the same size built with another seed (a new dataset version, so every cache is cold).
+    """
+
+    source_dir, watch_enabled = CONFIG.DATA_DIR_NAME, CONFIG.DATA_WATCH_ENABLED
+    # The datasets are switched by changing the data directory, which must be picked up by the next call rather
+    # than by the watcher thread
+    CONFIG.DATA_WATCH_ENABLED = False
+    results: Dict[str, Dict[str, Any]] = {}
+
+    try:
+        with tempfile.TemporaryDirectory() as timing_dir, tempfile.TemporaryDirectory() as memory_dir:
+            write_dataset(profile, n_rows, seed, timing_dir)
+            write_dataset(profile, n_rows, seed + 1, memory_dir)
+
+            CONFIG.DATA_DIR_NAME = timing_dir
+
+            for name, call in callback_steps(year):
+                start = time.perf_counter()
+                output = call()
+                cold = time.perf_counter() - start
+
+                warm = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    call()
+                    warm.append(time.perf_counter() - start)
+
+                results[name] = {
+                    'cold_s': cold,
+                    'warm_median_s': statistics.median(warm) if warm else None,
+                    **payload_stats(output),
+                }
+
+            CONFIG.DATA_DIR_NAME = memory_dir
+            for name, call in callback_steps(year):
+                tracemalloc.start()
+                call()
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                results[name]['peak_memory_bytes'] = peak
+    finally:
+        CONFIG.DATA_DIR_NAME, CONFIG.DATA_WATCH_ENABLED = source_dir, watch_enabled
+
+    return {'n_rows': n_rows, 'year': year, 'callbacks': results}
+
+
+def run(sizes: List[int], year: int, repeat: int, seed: int) -> Dict[str, Any]:
+    profile = synthetic_data.load_real_profile()
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'config': {
+            'DATA_STORE_MODE': CONFIG.DATA_STORE_MODE,
+            'GRID_ROW_MODEL': CONFIG.GRID_ROW_MODEL,
+            'SHARED_CACHE_ENABLED': CONFIG.SHARED_CACHE_ENABLED,
+            'JSON_ENGINE': CONFIG.JSON_ENGINE,
+        },
+        'runs': [bench_size(profile, n_rows, year, repeat, seed) for n_rows in sizes],
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    header = (
+        f'{"rows":>10}  {"callback":<28}{"cold ms":>10}{"warm ms":>10}{"peak MB":>10}{"payload KB":>12}'
+        f'{"json ms":>10}{"gzip KB":>10}'
+    )
+    print(header)
+    print('-' * len(header))
+    for run_ in report['runs']:
+        for name, res in run_['callbacks'].items():
+            warm = res['warm_median_s']
+            print(
+                f'{run_["n_rows"]:>10}  {name:<28}{res["cold_s"] * 1e3:>10.1f}'
+                f'{(warm * 1e3 if warm is not None else float("nan")):>10.2f}'
+                f'{res["peak_memory_bytes"] / 2 ** 20:>10.1f}{res["payload_bytes"] / 2 ** 10:>12.1f}'
+                f'{res.get("serialise_s", float("nan")) * 1e3:>10.2f}'
+                f'{res.get("gzip_bytes", float("nan")) / 2 ** 10:>10.1f}'
+            )
+
+
+def compare(baseline_path: str, candidate_path: str) -> None:
+    """
+    Prints the ratio candidate / baseline of every metric present in both result files.
+    """
+
+    with open(baseline_path) as f:
+        baseline = {run_['n_rows']: run_['callbacks'] for run_ in json.load(f)['runs']}
+    with open(candidate_path) as f:
+        candidate = {run_['n_rows']: run_['callbacks'] for run_ in json.load(f)['runs']}
+
+    metrics = ['cold_s', 'warm_median_s', 'peak_memory_bytes', 'payload_bytes', 'serialise_s', 'gzip_bytes']
+    print(f'{"rows":>10}  {"callback":<28}' + ''.join(f'{metric:>20}' for metric in metrics))
+    for n_rows in sorted(set(baseline) & set(candidate)):
+        for name in baseline[n_rows].keys() & candidate[n_rows].keys():
+            ratios = []
+            for metric in metrics:
+                old, new = baseline[n_rows][name].get(metric), candidate[n_rows][name].get(metric)
+                ratios.append(f'{new / old:>19.2f}x' if old and new is not None else f'{"-":>20}')
+            print(f'{n_rows:>10}  {name:<28}' + ''.join(ratios))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--year', type=int, default=DEFAULT_YEAR, help='Year selected in the dashboard.')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of warm calls per callback.')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Path of the JSON results (default: benchmarks/results/<timestamp>.json).')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CANDIDATE'))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+    else:
+        # Logging is configured before the first dataset is written
+        import_app()
+
+        report = run(args.sizes, args.year, args.repeat, args.seed)
+        print_report(report)
+
+        output = args.output or os.path.join(RESULTS_DIR, f'{datetime.now():%Y%m%d-%H%M%S}.json')
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'\nResults saved to {output}')
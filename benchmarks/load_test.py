@@ -0,0 +1,383 @@
+"""
+Load-tests the dashboard over HTTP by replaying the traffic of concurrent user sessions.
+
+Each simulated user runs sessions made of the requests a browser sends: the page load (page, layout and callback
+dependencies), the render of the page content by the routing callback, the initial data load when the page is not
+server-rendered (see CONFIG.SERVER_RENDERED_LAYOUT), then a few year changes, item type and number of companies
+changes and modal clicks, each followed by the callbacks Dash chains after it. Callback requests are POSTed to
+/_dash-update-component, with bodies built from the dependencies served by the app, like the Dash renderer does.
+
+The target is either the Flask test client of `app.server` (the default, no network needed) or a running server,
+e.g. a local gunicorn instance. The report gives the throughput and the p50/p95/p99 latency of every step.
+
+Usage:
+    python -m benchmarks.load_test --users 20 --sessions 5
+    python -m benchmarks.load_test --users 20 --sessions 5 --rows 200000
+    gunicorn app:server -w 4 & python -m benchmarks.load_test --url http://127.0.0.1:8000 --users 50
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import CONFIG
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+# Steps of a session, named after the callback they trigger, and the output that identifies each callback
+CALLBACK_OUTPUTS = {
+    'render_page': '_pages_content.children',
+    'load_drug_approvals_data': 'drug-approvals-data.data',
+    'update_drug_approvals_data': 'filtered-drug-approvals-data.data',
+    'update_stacked_fig': 'company-stacked-fig.figure',
+    'update_grid_rows_block': 'approvals-grid-data.getRowsResponse',
+    'toggle_modal_drug': 'modal-detailed-drug.opened',
+}
+
+PAGE_PATHS = ['/', '/_dash-layout', '/_dash-dependencies']
+
+Response = Tuple[int, int, Optional[Any]]
+
+
+def component_props(tree: Any) -> Dict[str, Any]:
+    """
+    Returns the properties of the components of a serialised layout which have an id, keyed by
+    'component-id.property', like the Dash renderer keeps them.
+    """
+
+    values = {}
+    if isinstance(tree, list):
+        for item in tree:
+            values.update(component_props(item))
+    elif isinstance(tree, dict) and 'props' in tree and 'type' in tree:
+        props = tree['props']
+        for prop_name, value in props.items():
+            if 'id' in props and isinstance(props['id'], str):
+                values[f'{props["id"]}.{prop_name}'] = value
+            values.update(component_props(value))
+    return values
+
+
+class FlaskTransport:
+    """
+    Sends the requests to the Flask test client of the app, one client per thread.
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self._local = threading.local()
+
+    def request(self, method: str, path: str, body: Optional[dict] = None) -> Response:
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.server.test_client()
+
+        response = client.open(path, method=method, json=body)
+        return response.status_code, len(response.data), response.get_json(silent=True)
+
+
+class HTTPTransport:
+    """
+    Sends the requests to a running server, one connection pool per thread.
+    """
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip('/')
+        self._local = threading.local()
+
+    def request(self, method: str, path: str, body: Optional[dict] = None) -> Response:
+        import requests
+
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+
+        response = session.request(method, self.base_url + path, json=body, timeout=60)
+        try:
+            content = response.json()
+        except ValueError:
+            content = None
+        return response.status_code, len(response.content), content
+
+
+class Recorder:
+    """
+    Collects the latency, response size and status of every request, by step.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[Tuple[float, int, bool]]] = defaultdict(list)
+
+    def add(self, step: str, latency: float, n_bytes: int, ok: bool) -> None:
+        with self._lock:
+            self.samples[step].append((latency, n_bytes, ok))
+
+
+class Session:
+    """
+    A simulated user session, which keeps the Store contents between its requests like the browser does.
+    """
+
+    def __init__(self, transport, dependencies: List[dict], recorder: Optional[Recorder], rng: random.Random):
+        self.transport = transport
+        self.recorder = recorder
+        self.rng = rng
+        self.callbacks = {
+            step: dep for step, output in CALLBACK_OUTPUTS.items()
+            for dep in dependencies if output in dep['output'].strip('.').split('...')
+        }
+        self.values: Dict[str, Any] = {
+            'item-select.value': 'disease_type',
+            'n-companies.value': 5,
+            'modal-detailed-drug.opened': False,
+        }
+
+    def _timed(self, step: str, method: str, path: str, body: Optional[dict] = None) -> Optional[Any]:
+        start = time.perf_counter()
+        try:
+            status, n_bytes, content = self.transport.request(method, path, body)
+        except Exception:
+            status, n_bytes, content = None, 0, None
+        latency = time.perf_counter() - start
+
+        # 204 is Dash's answer to a PreventUpdate
+        ok = status in (200, 204)
+        if self.recorder is not None:
+            self.recorder.add(step, latency, n_bytes, ok)
+        return content if ok else None
+
+    def call(self, step: str, **changed: Any) -> None:
+        """
+        Sends the request of a callback with the current values of its inputs and states. `changed` holds the
+        new values of the properties which triggered it, keyed by 'component-id.property'.
+        """
+
+        dependency = self.callbacks.get(step)
+        if dependency is None:
+            return
+        self.values.update(changed)
+
+        def prop(item: dict) -> dict:
+            return {**item, 'value': self.values.get(f'{item["id"]}.{item["property"]}')}
+
+        output = dependency['output']
+        outputs = [
+            {'id': key.rsplit('.', 1)[0], 'property': key.rsplit('.', 1)[1]}
+            for key in output.strip('.').split('...')
+        ]
+        body = {
+            'output': output,
+            'outputs': outputs if output.startswith('..') else outputs[0],
+            'inputs': [prop(item) for item in dependency['inputs']],
+            'state': [prop(item) for item in dependency['state']],
+            'changedPropIds': list(changed),
+        }
+
+        content = self._timed(step, 'POST', '/_dash-update-component', body)
+        for component_id, props in ((content or {}).get('response') or {}).items():
+            for prop_name, value in props.items():
+                self.values[f'{component_id}.{prop_name}'] = value
+
+    def change_year(self, year: int) -> None:
+        # Dash chains the callbacks which take the filtered Store as an input
+        self.call('update_drug_approvals_data', **{'year-input.value': year})
+        self.call('update_stacked_fig')
+        self.call('update_grid_rows_block', **{
+            'approvals-grid-data.getRowsRequest': {'startRow': 0, 'endRow': 50, 'sortModel': [], 'filterModel': {}}
+        })
+
+    def click_row(self) -> None:
+        rows = self.values.get('approvals-grid-data.rowData')
+        if not isinstance(rows, list):
+            rows = (self.values.get('approvals-grid-data.getRowsResponse') or {}).get('rowData')
+        if not rows:
+            return
+
+        row = self.rng.choice(rows)
+        self.call('toggle_modal_drug', **{
+            'approvals-grid-data.cellRendererData': {
+                'value': {'drugName': row['drug_name'], 'dateApproval': row['Date of Approval']}
+            },
+            'modal-detailed-drug.opened': False,
+        })
+
+    def initial_call(self, step: str) -> bool:
+        """
+        Tells whether the browser calls a callback when the page content is rendered.
+        """
+        dependency = self.callbacks.get(step)
+        return dependency is not None and not dependency.get('prevent_initial_call')
+
+    def run(self, n_year_changes: int, n_interactions: int) -> None:
+        for path in PAGE_PATHS:
+            self._timed(f'GET {path}', 'GET', path)
+
+        # The content of the page, server-rendered or with placeholders, is returned by the routing callback of
+        # Dash pages
+        self.call('render_page', **{'_pages_location.pathname': '/', '_pages_location.search': ''})
+        self.values.update(component_props(self.values.get('_pages_content.children')))
+
+        if self.initial_call('load_drug_approvals_data'):
+            self.call('load_drug_approvals_data', **{'drug-approvals-data.input': None})
+        year_min = self.values.get('year-input.min')
+        year_max = self.values.get('year-input.max')
+        if year_min is None or year_max is None:
+            return
+        if self.initial_call('update_drug_approvals_data'):
+            self.change_year(self.values['year-input.value'])
+
+        for _ in range(n_year_changes):
+            self.change_year(self.rng.randint(year_min, year_max))
+            for _ in range(n_interactions):
+                action = self.rng.choice(['item', 'companies', 'modal'])
+                if action == 'item':
+                    self.call('update_stacked_fig', **{
+                        'item-select.value': self.rng.choice(['disease_type', 'drug_type'])
+                    })
+                elif action == 'companies':
+                    self.call('update_stacked_fig', **{'n-companies.value': self.rng.randint(5, 15)})
+                else:
+                    self.click_row()
+
+
+def summarize(recorder: Recorder, elapsed: float) -> Dict[str, Any]:
+    steps = {}
+    for step, samples in sorted(recorder.samples.items()):
+        latencies = np.array([latency for latency, _, _ in samples])
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        steps[step] = {
+            'requests': len(samples),
+            'errors': sum(not ok for _, _, ok in samples),
+            'p50_ms': p50 * 1e3,
+            'p95_ms': p95 * 1e3,
+            'p99_ms': p99 * 1e3,
+            'mean_bytes': float(np.mean([n_bytes for _, n_bytes, _ in samples])),
+        }
+
+    n_requests = sum(step['requests'] for step in steps.values())
+    return {
+        'elapsed_s': elapsed,
+        'requests': n_requests,
+        'errors': sum(step['errors'] for step in steps.values()),
+        'throughput_rps': n_requests / elapsed if elapsed else None,
+        'steps': steps,
+    }
+
+
+def run_load_test(
+        transport,
+        users: int,
+        sessions: int,
+        year_changes: int,
+        interactions: int,
+        seed: int,
+        warmup: int = 1
+) -> Dict[str, Any]:
+    """
+    Runs `sessions` sessions for each of `users` concurrent users.
+
+    Args:
+        transport: A FlaskTransport or an HTTPTransport.
+        users (int): Number of concurrent users.
+        sessions (int): Number of sessions of each user.
+        year_changes (int): Number of year changes per session.
+        interactions (int): Number of item type, number of companies or modal interactions after each year
+            change.
+        seed (int): Seed of the random choices of the users.
+        warmup (int): Number of sessions run before the measure, sequentially, to fill the caches.
+
+    Returns:
+        Dict[str, Any]: The summary of the measured requests (see summarize).
+    """
+
+    _, _, dependencies = transport.request('GET', '/_dash-dependencies')
+    if not isinstance(dependencies, list):
+        raise RuntimeError('Could not read the callback dependencies of the app.')
+
+    for i in range(warmup):
+        Session(transport, dependencies, None, random.Random(seed - 1 - i)).run(year_changes, interactions)
+
+    recorder = Recorder()
+
+    def user(index: int) -> None:
+        rng = random.Random(seed + index)
+        for _ in range(sessions):
+            Session(transport, dependencies, recorder, rng).run(year_changes, interactions)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        for future in [executor.submit(user, index) for index in range(users)]:
+            future.result()
+    return summarize(recorder, time.perf_counter() - start)
+
+
+def print_report(summary: Dict[str, Any]) -> None:
+    print(
+        f'{summary["requests"]} requests in {summary["elapsed_s"]:.1f} s '
+        f'({summary["throughput_rps"]:.1f} req/s), {summary["errors"]} errors'
+    )
+    header = f'{"step":<30}{"requests":>10}{"errors":>8}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"mean KB":>10}'
+    print(header)
+    print('-' * len(header))
+    for step, res in summary['steps'].items():
+        print(
+            f'{step:<30}{res["requests"]:>10}{res["errors"]:>8}{res["p50_ms"]:>10.1f}{res["p95_ms"]:>10.1f}'
+            f'{res["p99_ms"]:>10.1f}{res["mean_bytes"] / 2 ** 10:>10.1f}'
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='Base URL of a running server. Defaults to the Flask test client of the app.')
+    parser.add_argument('--rows', type=int, help='With the test client, serve a synthetic dataset of this size.')
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--sessions', type=int, default=3)
+    parser.add_argument('--year-changes', type=int, default=3)
+    parser.add_argument('--interactions', type=int, default=3)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Path of the JSON summary, defaults to benchmarks/results/load_<time>.json')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        if args.url:
+            transport = HTTPTransport(args.url)
+        else:
+            if args.rows:
+                from benchmarks import synthetic_data
+
+                filepath = os.path.join(data_dir, CONFIG.FILENAME_MAPPING['NEW_DRUG_APPROVALS_FILENAME'])
+                synthetic_data.write_dataset(synthetic_data.load_real_profile(), filepath, args.rows, args.seed)
+                CONFIG.DATA_DIR_NAME = data_dir
+
+            import app
+            transport = FlaskTransport(app.server)
+
+        summary = run_load_test(
+            transport, args.users, args.sessions, args.year_changes, args.interactions, args.seed, args.warmup
+        )
+
+    summary.update({
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'target': args.url or 'flask-test-client',
+        'rows': args.rows,
+        'users': args.users,
+        'sessions': args.sessions,
+    })
+    print_report(summary)
+
+    output = args.output or os.path.join(RESULTS_DIR, f'load_{datetime.now():%Y%m%d-%H%M%S}.json')
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(summary, f, indent=2)
+    print(f'\nResults saved to {output}')
@@ -0,0 +1,171 @@
+"""
+Measures the cold start of the dashboard: what a new container or gunicorn worker goes through before it can
+answer its first requests.
+
+Each run starts a fresh interpreter which imports `app`, answers the page request, then the first callback (the
+render of the page content by the routing callback of Dash pages which, with CONFIG.SERVER_RENDERED_LAYOUT,
+imports the data layer, parses the file and computes the initial view). The report gives the median time to each step,
+from the start of the process, and which heavy modules are already imported when the app is. A separate run with
+`python -X importtime` breaks the import time down by top-level package.
+
+The time to the first request is checked against STARTUP_TARGET_MS (see the README), the exit code is 1 when the
+median is above it.
+
+Usage:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 10 --target-ms 1200
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+# Documented target for the time to the first request, from the start of the process
+STARTUP_TARGET_MS = 1500
+
+# Modules which should not be imported before the first callback needs them
+DEFERRED_MODULES = ['pandas', 'plotly.express', 'pyarrow', 'utils.loading_data', 'utils.year_view']
+
+STEPS = ['interpreter', 'import', 'first_request', 'first_callback']
+
+# Run in the fresh interpreter: prints the time of each step, relative to the start of the script
+CHILD_SCRIPT = '''
+import json, sys, time
+started_at = time.time()
+start = time.perf_counter()
+marks = {}
+import app
+marks['import'] = time.perf_counter() - start
+deferred = {name: name in sys.modules for name in sys.argv[1].split(',')}
+client = app.server.test_client()
+client.get('/')
+client.get('/_dash-layout')
+marks['first_request'] = time.perf_counter() - start
+output = next(key for key in app.app.callback_map if '_pages_content.children' in key)
+client.post('/_dash-update-component', json={
+    'output': output,
+    'outputs': [
+        {'id': item.rsplit('.', 1)[0], 'property': item.rsplit('.', 1)[1]} for item in output.strip('.').split('...')
+    ],
+    'inputs': [
+        {'id': '_pages_location', 'property': 'pathname', 'value': '/'},
+        {'id': '_pages_location', 'property': 'search', 'value': ''},
+    ],
+    'state': [],
+    'changedPropIds': ['_pages_location.pathname'],
+})
+marks['first_callback'] = time.perf_counter() - start
+print(json.dumps({'started_at': started_at, 'marks': marks, 'deferred': deferred}))
+'''
+
+
+def run_once() -> Dict[str, Any]:
+    """
+    Starts a fresh interpreter and returns the time of each step, in seconds from the start of the process.
+    """
+
+    spawned_at = time.time()
+    result = subprocess.run(
+        [sys.executable, '-c', CHILD_SCRIPT, ','.join(DEFERRED_MODULES)],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    child = json.loads(result.stdout.strip().splitlines()[-1])
+    interpreter = child['started_at'] - spawned_at
+    return {
+        'steps': {'interpreter': interpreter, **{step: interpreter + t for step, t in child['marks'].items()}},
+        'deferred': child['deferred'],
+    }
+
+
+def import_breakdown() -> Tuple[float, List[Tuple[str, float]]]:
+    """
+    Imports `app` with `-X importtime` and returns the total import time and the self time of each top-level
+    package, in seconds, slowest first.
+    """
+
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    total = 0.0
+    packages: Dict[str, float] = defaultdict(float)
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        packages[name.strip().split('.')[0]] += int(self_us) / 1e6
+        if name.strip() == 'app':
+            total = int(cumulative_us) / 1e6
+    return total, sorted(packages.items(), key=lambda item: item[1], reverse=True)
+
+
+def run(runs: int) -> Dict[str, Any]:
+    results = [run_once() for _ in range(runs)]
+    total, packages = import_breakdown()
+    return {
+        'runs': runs,
+        'steps_ms': {
+            step: statistics.median(result['steps'][step] for result in results) * 1e3 for step in STEPS
+        },
+        'deferred_modules_imported': {
+            name: any(result['deferred'][name] for result in results) for name in DEFERRED_MODULES
+        },
+        'import_ms': total * 1e3,
+        'import_by_package_ms': {name: seconds * 1e3 for name, seconds in packages[:15]},
+    }
+
+
+def print_report(summary: Dict[str, Any], target_ms: float) -> None:
+    print(f'Median over {summary["runs"]} cold starts, from the start of the process:')
+    for step, value in summary['steps_ms'].items():
+        print(f'  {step:<20}{value:>10.0f} ms')
+    status = 'OK' if summary['steps_ms']['first_request'] <= target_ms else 'ABOVE TARGET'
+    print(f'  target first_request {target_ms:>8.0f} ms  {status}')
+
+    print('\nDeferred modules imported with the app:')
+    for name, imported in summary['deferred_modules_imported'].items():
+        print(f'  {name:<20}{"yes" if imported else "no":>10}')
+
+    print(f'\nImport of app: {summary["import_ms"]:.0f} ms, self time by package:')
+    for name, value in summary['import_by_package_ms'].items():
+        print(f'  {name:<20}{value:>10.0f} ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--target-ms', type=float, default=STARTUP_TARGET_MS)
+    parser.add_argument('--output', help='Path of the JSON summary, defaults to benchmarks/results/startup_<time>.json')
+    args = parser.parse_args()
+
+    summary = run(args.runs)
+    summary.update({
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'target_ms': args.target_ms,
+    })
+    print_report(summary, args.target_ms)
+
+    output = args.output or os.path.join(RESULTS_DIR, f'startup_{datetime.now():%Y%m%d-%H%M%S}.json')
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(summary, f, indent=2)
+    print(f'\nResults saved to {output}')
+
+    sys.exit(0 if summary['steps_ms']['first_request'] <= args.target_ms else 1)
@@ -0,0 +1,220 @@
+"""
+Generates synthetic drug approvals datasets of any size with the distributions of the real file.
+
+A profile is first learned from data/new_drug_approvals.csv: its columns and missing-value rates, the frequencies
+of the categorical columns, the joint distribution of (drug_type, disease_type), the length and vocabulary of the
+descriptions, and the distribution of approvals per year and per month (seasonality). Rows are then generated
+chunk by chunk and appended to the output file, so memory stays bounded whatever the number of rows. A given
+seed and chunk size always produce the same file.
+
+Usage:
+    python -m benchmarks.synthetic_data --rows 1000000 --output /tmp/new_drug_approvals.csv
+    python -m benchmarks.synthetic_data --rows 1000000 --output /tmp/new_drug_approvals.parquet --format parquet
+"""
+import argparse
+import logging
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import CONFIG
+from utils import columnar
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Columns sampled from their observed frequencies
+CATEGORICAL_COLUMNS = ['Company', 'mode_administration', 'Treatment for']
+
+Distribution = Tuple[np.ndarray, np.ndarray]
+
+
+@dataclass(frozen=True)
+class DatasetProfile:
+    """
+    Distributions learned from a real dataset.
+
+    Attributes:
+        columns (List[str]): Columns of the real file, in order.
+        missing_rates (Dict[str, float]): Fraction of missing values of each column.
+        categorical (Dict[str, Distribution]): Values and probabilities of each column of CATEGORICAL_COLUMNS.
+        drug_disease_types (Distribution): Indices of the (drug_type, disease_type) pairs and their probabilities.
+        type_pairs (List[Tuple[str, str]]): The observed (drug_type, disease_type) pairs.
+        description_lengths (np.ndarray): Observed numbers of words of the descriptions.
+        vocabulary (Distribution): Words of the descriptions and their probabilities.
+        years (Distribution): Years of approval and their probabilities.
+        months (Distribution): Months of approval (1-12) and their probabilities.
+    """
+    columns: List[str]
+    missing_rates: Dict[str, float]
+    categorical: Dict[str, Distribution]
+    drug_disease_types: Distribution
+    type_pairs: List[Tuple[str, str]]
+    description_lengths: np.ndarray
+    vocabulary: Distribution
+    years: Distribution
+    months: Distribution
+
+
+def _frequencies(values: pd.Series) -> Distribution:
+    counts = values.value_counts()
+    return counts.index.to_numpy(), (counts / counts.sum()).to_numpy()
+
+
+def learn_profile(df: pd.DataFrame) -> DatasetProfile:
+    """
+    Learns the profile of a raw approvals dataset, as read from its CSV file.
+    """
+
+    dates = pd.to_datetime(df['Date of Approval'], errors='coerce').dropna()
+
+    pairs = df[['drug_type', 'disease_type']].dropna().value_counts()
+    type_pairs = list(pairs.index)
+
+    words = df['description'].dropna().str.split()
+    vocabulary = _frequencies(words.explode())
+
+    return DatasetProfile(
+        columns=list(df.columns),
+        missing_rates=df.isna().mean().to_dict(),
+        categorical={col: _frequencies(df[col].dropna()) for col in CATEGORICAL_COLUMNS},
+        drug_disease_types=(np.arange(len(type_pairs)), (pairs / pairs.sum()).to_numpy()),
+        type_pairs=type_pairs,
+        description_lengths=words.str.len().to_numpy(),
+        vocabulary=vocabulary,
+        years=_frequencies(dates.dt.year),
+        months=_frequencies(dates.dt.month),
+    )
+
+
+def _sample(rng: np.random.Generator, distribution: Distribution, n_rows: int) -> np.ndarray:
+    values, probabilities = distribution
+    return values[rng.choice(len(values), size=n_rows, p=probabilities)]
+
+
+def generate_chunk(profile: DatasetProfile, rng: np.random.Generator, n_rows: int, offset: int) -> pd.DataFrame:
+    """
+    Generates n_rows synthetic approvals.
+
+    Args:
+        profile (DatasetProfile): The learned distributions.
+        rng (np.random.Generator): The random generator, shared by all the chunks of a file.
+        n_rows (int): Number of rows to generate.
+        offset (int): Index of the first row in the file, used to give every drug a unique name.
+
+    Returns:
+        pd.DataFrame: The rows, with the columns of the real file.
+    """
+
+    chunk = pd.DataFrame(index=range(n_rows), columns=profile.columns, dtype=object)
+
+    ids = np.arange(offset, offset + n_rows)
+    chunk['drug_name'] = [f'Synthetix {i}' for i in ids]
+    chunk['drug_generic_name'] = [f'synthetimab-{i:x}' for i in ids]
+
+    for col in CATEGORICAL_COLUMNS:
+        chunk[col] = _sample(rng, profile.categorical[col], n_rows)
+
+    pairs = _sample(rng, profile.drug_disease_types, n_rows)
+    chunk['drug_type'] = [profile.type_pairs[i][0] for i in pairs]
+    chunk['disease_type'] = [profile.type_pairs[i][1] for i in pairs]
+
+    # Descriptions keep the observed lengths and word frequencies
+    lengths = rng.choice(profile.description_lengths, size=n_rows)
+    words = _sample(rng, profile.vocabulary, int(lengths.sum()))
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    chunk['description'] = [' '.join(words[start:end]) for start, end in zip(bounds[:-1], bounds[1:])]
+
+    # Approval dates keep the yearly volumes and the monthly seasonality
+    years = _sample(rng, profile.years, n_rows).astype(int)
+    months = _sample(rng, profile.months, n_rows).astype(int)
+    days = rng.integers(1, 29, n_rows)
+    chunk['Date of Approval'] = pd.to_datetime(
+        pd.DataFrame({'year': years, 'month': months, 'day': days})
+    ).dt.strftime('%Y-%m-%d')
+
+    for col, rate in profile.missing_rates.items():
+        if rate > 0:
+            chunk.loc[rng.random(n_rows) < rate, col] = None
+
+    return chunk
+
+
+def iter_chunks(
+        profile: DatasetProfile,
+        n_rows: int,
+        seed: int,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    """
+    Yields the rows of a synthetic dataset chunk by chunk.
+    """
+
+    rng = np.random.default_rng(seed)
+    for offset in range(0, n_rows, chunk_size):
+        yield generate_chunk(profile, rng, min(chunk_size, n_rows - offset), offset)
+
+
+def write_dataset(
+        profile: DatasetProfile,
+        filepath: str,
+        n_rows: int,
+        seed: int,
+        file_format: str = 'csv',
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> None:
+    """
+    Writes a synthetic dataset to a CSV file, or to a Parquet file with the schema of utils.columnar.
+
+    Args:
+        profile (DatasetProfile): The learned distributions.
+        filepath (str): Path of the output file.
+        n_rows (int): Number of rows.
+        seed (int): Seed of the random generator.
+        file_format (str): 'csv' or 'parquet'.
+        chunk_size (int): Number of rows generated and written at a time.
+    """
+
+    directory = os.path.dirname(filepath)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    if file_format == 'parquet':
+        if not columnar.is_available():
+            raise RuntimeError('pyarrow is required to write Parquet files.')
+
+        schema = columnar.SCHEMAS['NEW_DRUG_APPROVALS_FILENAME']()
+        with columnar.pq.ParquetWriter(filepath, schema) as writer:
+            for chunk in iter_chunks(profile, n_rows, seed, chunk_size):
+                chunk = chunk.reindex(columns=schema.names)
+                chunk['Date of Approval'] = pd.to_datetime(chunk['Date of Approval'])
+                writer.write_table(columnar.pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        return
+
+    for i, chunk in enumerate(iter_chunks(profile, n_rows, seed, chunk_size)):
+        chunk.to_csv(filepath, index=False, mode='w' if i == 0 else 'a', header=i == 0)
+
+
+def load_real_profile() -> DatasetProfile:
+    """
+    Learns the profile of the real approvals file of the data directory.
+    """
+
+    filename = CONFIG.FILENAME_MAPPING['NEW_DRUG_APPROVALS_FILENAME']
+    return learn_profile(pd.read_csv(f'{CONFIG.DATA_DIR_NAME}/{filename}'))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, required=True)
+    parser.add_argument('--output', required=True)
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    write_dataset(load_real_profile(), args.output, args.rows, args.seed, args.format, args.chunk_size)
+    logging.info(f'[+] {args.rows} synthetic rows written to {args.output}')
@@ -1,5 +1,34 @@
 from user_config import (
     DEFAULT_ENVIRONMENT,
+    DEFAULT_DATA_STORE_MODE,
+    DEFAULT_FIGURE_CACHE_MAX_ENTRIES,
+    DEFAULT_FIGURE_CACHE_MAX_BYTES,
+    DEFAULT_SHARED_CACHE_ENABLED,
+    DEFAULT_SHARED_CACHE_PATH,
+    DEFAULT_SHARED_CACHE_TTL,
+    DEFAULT_GRID_ROW_MODEL,
+    DEFAULT_JSON_ENGINE,
+    DEFAULT_COMPRESSION_ENABLED,
+    DEFAULT_COMPRESSION_ALGORITHMS,
+    DEFAULT_COMPRESSION_MIN_SIZE,
+    DEFAULT_METRICS_ENABLED,
+    DEFAULT_METRICS_PATH,
+    DEFAULT_PROFILING_ENABLED,
+    DEFAULT_PROFILING_THRESHOLD_MS,
+    DEFAULT_PROFILING_DIR,
+    DEFAULT_TRACING_ENABLED,
+    DEFAULT_TRACING_PATH,
+    DEFAULT_DATA_WATCH_ENABLED,
+    DEFAULT_DATA_WATCH_INTERVAL,
+    DEFAULT_NOTIFICATIONS_ENABLED,
+    DEFAULT_NOTIFICATIONS_PATH,
+    DEFAULT_SERVER_RENDERED_LAYOUT,
+    DEFAULT_HTTP_CACHE_ENABLED,
+    DEFAULT_HTTP_CACHE_MAX_AGE,
+    DEFAULT_VIEW_PATH,
+    DEFAULT_BACKGROUND_CALLBACKS_ENABLED,
+    DEFAULT_BACKGROUND_CALLBACKS_DIR,
+    DEFAULT_BACKGROUND_CALLBACKS_EXPIRE,
     DATA_DIRECTORY_NAME,
     NEW_DRUG_APPROVALS_FILENAME,
 )
@@ -9,6 +38,39 @@ ENV = get_env_variable("ENV", DEFAULT_ENVIRONMENT)
 
 
 class BaseConfig:
+    DATA_STORE_MODE = get_env_variable("DATA_STORE_MODE", DEFAULT_DATA_STORE_MODE)
+    FIGURE_CACHE_MAX_ENTRIES = get_env_variable("FIGURE_CACHE_MAX_ENTRIES", DEFAULT_FIGURE_CACHE_MAX_ENTRIES)
+    FIGURE_CACHE_MAX_BYTES = get_env_variable("FIGURE_CACHE_MAX_BYTES", DEFAULT_FIGURE_CACHE_MAX_BYTES)
+    SHARED_CACHE_ENABLED = get_env_variable("SHARED_CACHE_ENABLED", DEFAULT_SHARED_CACHE_ENABLED).lower() == 'true'
+    SHARED_CACHE_PATH = get_env_variable("SHARED_CACHE_PATH", DEFAULT_SHARED_CACHE_PATH)
+    SHARED_CACHE_TTL = get_env_variable("SHARED_CACHE_TTL", DEFAULT_SHARED_CACHE_TTL)
+    GRID_ROW_MODEL = get_env_variable("GRID_ROW_MODEL", DEFAULT_GRID_ROW_MODEL)
+    JSON_ENGINE = get_env_variable("JSON_ENGINE", DEFAULT_JSON_ENGINE)
+    COMPRESSION_ENABLED = get_env_variable("COMPRESSION_ENABLED", DEFAULT_COMPRESSION_ENABLED).lower() == 'true'
+    COMPRESSION_ALGORITHMS = get_env_variable("COMPRESSION_ALGORITHMS", DEFAULT_COMPRESSION_ALGORITHMS)
+    COMPRESSION_MIN_SIZE = get_env_variable("COMPRESSION_MIN_SIZE", DEFAULT_COMPRESSION_MIN_SIZE)
+    METRICS_ENABLED = get_env_variable("METRICS_ENABLED", DEFAULT_METRICS_ENABLED).lower() == 'true'
+    METRICS_PATH = get_env_variable("METRICS_PATH", DEFAULT_METRICS_PATH)
+    PROFILING_ENABLED = get_env_variable("PROFILING_ENABLED", DEFAULT_PROFILING_ENABLED).lower() == 'true'
+    PROFILING_THRESHOLD_MS = get_env_variable("PROFILING_THRESHOLD_MS", DEFAULT_PROFILING_THRESHOLD_MS)
+    PROFILING_DIR = get_env_variable("PROFILING_DIR", DEFAULT_PROFILING_DIR)
+    TRACING_ENABLED = get_env_variable("TRACING_ENABLED", DEFAULT_TRACING_ENABLED).lower() == 'true'
+    TRACING_PATH = get_env_variable("TRACING_PATH", DEFAULT_TRACING_PATH)
+    DATA_WATCH_ENABLED = get_env_variable("DATA_WATCH_ENABLED", DEFAULT_DATA_WATCH_ENABLED).lower() == 'true'
+    DATA_WATCH_INTERVAL = get_env_variable("DATA_WATCH_INTERVAL", DEFAULT_DATA_WATCH_INTERVAL)
+    NOTIFICATIONS_ENABLED = get_env_variable("NOTIFICATIONS_ENABLED", DEFAULT_NOTIFICATIONS_ENABLED).lower() == 'true'
+    NOTIFICATIONS_PATH = get_env_variable("NOTIFICATIONS_PATH", DEFAULT_NOTIFICATIONS_PATH)
+    SERVER_RENDERED_LAYOUT = get_env_variable(
+        "SERVER_RENDERED_LAYOUT", DEFAULT_SERVER_RENDERED_LAYOUT
+    ).lower() == 'true'
+    HTTP_CACHE_ENABLED = get_env_variable("HTTP_CACHE_ENABLED", DEFAULT_HTTP_CACHE_ENABLED).lower() == 'true'
+    HTTP_CACHE_MAX_AGE = get_env_variable("HTTP_CACHE_MAX_AGE", DEFAULT_HTTP_CACHE_MAX_AGE)
+    VIEW_PATH = get_env_variable("VIEW_PATH", DEFAULT_VIEW_PATH)
+    BACKGROUND_CALLBACKS_ENABLED = get_env_variable(
+        "BACKGROUND_CALLBACKS_ENABLED", DEFAULT_BACKGROUND_CALLBACKS_ENABLED
+    ).lower() == 'true'
+    BACKGROUND_CALLBACKS_DIR = get_env_variable("BACKGROUND_CALLBACKS_DIR", DEFAULT_BACKGROUND_CALLBACKS_DIR)
+    BACKGROUND_CALLBACKS_EXPIRE = get_env_variable("BACKGROUND_CALLBACKS_EXPIRE", DEFAULT_BACKGROUND_CALLBACKS_EXPIRE)
     FILENAME_MAPPING = {
         'NEW_DRUG_APPROVALS_FILENAME': NEW_DRUG_APPROVALS_FILENAME,
     }
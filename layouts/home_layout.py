@@ -48,12 +48,13 @@ def make_container(
     )
 
 
-def assemble_kpi_panel(kpi_item: Dict[str, str]) -> dmc.Group:
+def assemble_kpi_panel(kpi_item: Dict[str, str], value: Any = None) -> dmc.Group:
     """
     Constructs a panel for displaying a key performance indicator (KPI) using badges and text.
 
     Args:
         kpi_item (Dict[str, str]): Dictionary containing label, icon, and color for the KPI.
+        value (Any): Initial value of the KPI, None until the year view fills it in.
 
     Returns:
         dmc.Group: A component group that visually represents the KPI with an icon and labels.
@@ -78,7 +79,7 @@ def assemble_kpi_panel(kpi_item: Dict[str, str]) -> dmc.Group:
                         style={'font-size': '0.9375'}
                     ),
                     dmc.Text(
-                        None,
+                        value,
                         transform='capitalize',
                         weight=500,
                         style={'font-size': '1rem'},
@@ -1,20 +1,37 @@
-from typing import List, Dict, Any
+import logging
+from typing import TYPE_CHECKING, Dict, Any, Optional
 
 import dash
 from dash import dcc, html, callback, Input, Output, State, no_update, clientside_callback, ClientsideFunction
 from dash.exceptions import PreventUpdate
 import dash_mantine_components as dmc
 import dash_ag_grid as dag
-import pandas as pd
 from plotly.graph_objs import Figure
 
 from assets.header import header
 
+from utils.background import heavy_callback, report_progress, ProgressSetter
+
+from utils.figure_cache import FIGURE_CACHE
+
+from utils.lazy_imports import lazy_import
+
+from utils.serialisation import loads
+
+from utils.tracing import traced
+
+from utils.grid_blocks import (
+    get_rows_block,
+    sort_key,
+    GRID_BLOCK_SIZE,
+)
+
 from utils.home_utils import (
     plot_approvals_year,
     plot_drug_type,
     plot_stacked_item_company,
     add_loading_overlay,
+    load_placeholder_figures,
     MARGIN_BOTTOM
 )
 
@@ -25,12 +42,29 @@ from layouts.home_layout import (
     make_modal
 )
 
+from config import CONFIG
+
 from layout_constants import (
     FIG_CONFIG,
     KPI_ITEMS as kpi_items,
-    SUFFIXES_TO_DELETE,
 )
 
+if TYPE_CHECKING:
+    from utils.loading_data import DatasetSnapshot
+
+# The data layer (pandas, the dataset and its aggregates) is imported by the first callback rather than when the
+# page is registered, which keeps it out of the startup path
+data_store = lazy_import('utils.data_store')
+loading_data = lazy_import('utils.loading_data')
+year_view = lazy_import('utils.year_view')
+
+# The EventSource of the notifications is only imported when they are enabled. Dash lists the scripts of the
+# component libraries imported when the page is requested, so the import cannot wait for the first layout
+if CONFIG.NOTIFICATIONS_ENABLED:
+    import dash_extensions as de
+
+PLACEHOLDER_FIGURES = load_placeholder_figures()
+
 dash.register_page(
     __name__,
     path='/',
@@ -42,491 +76,649 @@ dash.register_page(
     image="miniature.png"
 )
 
-layout = html.Div(
-    [
-        dcc.Store(data=None, id='drug-approvals-data'),
-        dcc.Store(data=None, id='filtered-drug-approvals-data'),
-        dcc.Store(id='mouse-position'),
-        make_modal(),
-        dmc.Grid(
-            [
-                dmc.Col(
-                    [
-                        dmc.Group(
-                            [
-                                dmc.Group(
-                                    [
-                                        dmc.Title(
-                                            'Drug Approval Overview for',
-                                            order=3,
-                                            align='justify',
-                                            style={
-                                                'font-family': 'Roboto, Sans Serif',
-                                                'font-weight': '300'
-                                            }
-
-                                        ),
-                                        dmc.NumberInput(
-                                            label=None,
-                                            id='year-input',
-                                            p=0,
-                                            mt=-3,
-                                            style={"width": "90px"},
-                                            styles={
-                                                'input': {
-                                                    'background-color': '#F8F8F8',
-                                                    'padding-left': '0',
-                                                    'border': 'none',
-                                                    'font-size': '1.375rem',
-                                                    'font-weight': '300',
+# Column definitions of the approvals grid, including custom renderers for interactive functionality
+GRID_COLUMN_DEFS = [
+    {
+        'headerName': 'Date',
+        'field': 'Date of Approval',
+    },
+    {
+        'headerName': 'Drug Name',
+        'field': 'drug_name',
+    },
+    {
+        'field': 'Details',
+        'cellRenderer': 'DMC_ActionIcon',
+        'cellRendererParams': {
+            'icon': 'f7:ellipsis-circle-fill',
+            'iconColor': '#bfbfbf',
+            'iconWidth': '20',
+            'iconHeight': '20',
+            'variant': 'subtle',
+            'marginTop': '8px',
+            'marginLeft': '6px',
+        }
+    },
+]
+
+# Row model of the approvals grid: in 'infinite' mode the grid only fetches the visible blocks of rows from the
+# server (see update_grid_rows_block), otherwise all the rows of the year are sent at once
+if CONFIG.GRID_ROW_MODEL == 'infinite':
+    GRID_ROW_MODEL_PROPS = {
+        'rowModelType': 'infinite',
+        'dashGridOptions': {
+            'suppressMovableColumns': True,
+            'cacheBlockSize': GRID_BLOCK_SIZE,
+            'infiniteInitialRowCount': GRID_BLOCK_SIZE,
+            'maxBlocksInCache': 20,
+        },
+    }
+else:
+    GRID_ROW_MODEL_PROPS = {'dashGridOptions': {'suppressMovableColumns': True}}
+
+# Default selection of the company chart, and the values the URL may select (see parse_view_state)
+DEFAULT_ITEM_TYPE = 'disease_type'
+DEFAULT_N_COMPANIES = 5
+ITEM_TYPES = ['disease_type', 'drug_type']
+MIN_N_COMPANIES, MAX_N_COMPANIES = 5, 15
+
+# Outputs of update_drug_approvals_data, also used to key the server-rendered values (see render_initial_state)
+YEAR_VIEW_OUTPUTS = [
+    Output('filtered-drug-approvals-data', 'data'),
+    Output('total-approvals-title', 'children'),
+    Output('approved-drugs-title', 'children'),
+    Output('total-approvals-count', 'children'),
+    Output('top-company-kpi', 'children'),
+    Output('main-focus-kpi', 'children'),
+    Output('leading-class-kpi', 'children'),
+    Output('last-updated-kpi', 'children'),
+    Output('yearly-approvals-fig', 'figure'),
+    Output('drug-type-fig', 'figure'),
+    Output('approvals-grid-data', 'rowData'),
+]
+
+
+def parse_view_state(query: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Reads the state of the dashboard from the query string of the page, e.g. `?year=2023&item_type=drug_type&
+    n_companies=10`, which update_url_state keeps in sync with the inputs. Missing or invalid values fall back to
+    the default view.
+
+    Args:
+        query (Dict[str, str]): The query string parameters.
+
+    Returns:
+        Dict[str, Any]: The selected year (None for the default year), item type and number of companies.
+    """
+
+    def to_int(value: Any) -> Optional[int]:
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    item_type = query.get('item_type')
+    n_companies = to_int(query.get('n_companies'))
+    return {
+        'year': to_int(query.get('year')),
+        'item_type': item_type if item_type in ITEM_TYPES else DEFAULT_ITEM_TYPE,
+        'n_companies': (
+            n_companies if n_companies is not None and MIN_N_COMPANIES <= n_companies <= MAX_N_COMPANIES
+            else DEFAULT_N_COMPANIES
+        ),
+    }
+
+
+def render_initial_state(
+        year: Optional[int] = None,
+        item_type: str = DEFAULT_ITEM_TYPE,
+        n_companies: int = DEFAULT_N_COMPANIES
+) -> Dict[str, Any]:
+    """
+    Computes a view of the dashboard on the server, from the cached dataset and year views: what
+    load_drug_approvals_data, update_drug_approvals_data and update_stacked_fig would send after the first paint.
+
+    Args:
+        year (Optional[int]): The selected year, the current year if None or outside the dataset.
+        item_type (str): The item type of the company chart.
+        n_companies (int): The number of companies of the company chart.
+
+    Returns:
+        Dict[str, Any]: The values of the component properties, keyed by 'id.property'. Empty when
+        CONFIG.SERVER_RENDERED_LAYOUT is disabled or the dataset cannot be loaded, in which case the page keeps
+        its placeholders.
+    """
+
+    if not CONFIG.SERVER_RENDERED_LAYOUT:
+        return {}
+
+    try:
+        snapshot = loading_data.get_snapshot('NEW_DRUG_APPROVALS_FILENAME', 'csv')
+    except RuntimeError as e:
+        logging.warning(f'[!] Rendering the page without data: {e}')
+        return {}
+
+    return render_view(snapshot, year, item_type, n_companies)
+
+
+def render_view(snapshot: 'DatasetSnapshot', year: Optional[int], item_type: str, n_companies: int) -> Dict[str, Any]:
+    """
+    Computes a view of the dashboard from a dataset snapshot, for the server-rendered page (render_initial_state)
+    and for the view endpoint (see utils.http_cache). Takes the same arguments as render_initial_state, and
+    returns the values of the component properties, keyed by 'id.property'.
+    """
+
+    min_year, max_year, current_year = year_view.year_bounds(snapshot.data)
+    if year is None or not min_year <= year <= max_year:
+        year = current_year
+    initial = {
+        'drug-approvals-data.data': data_store.make_store_payload(snapshot),
+        'drug-approvals-last-update.data': snapshot.last_update,
+        'year-input.min': min_year,
+        'year-input.max': max_year,
+        'year-input.value': year,
+    }
+
+    outputs = render_year(year, initial['drug-approvals-data.data'], snapshot.last_update)
+    initial.update({
+        f'{output.component_id}.{output.component_property}': value
+        for output, value in zip(YEAR_VIEW_OUTPUTS, outputs) if value is not no_update
+    })
+    initial['company-stacked-fig.figure'] = render_stacked_fig(
+        initial['filtered-drug-approvals-data.data'], item_type, n_companies
+    )
+    return initial
+
+
+def initial_props(initial: Dict[str, Any], component_id: str, *props: str) -> Dict[str, Any]:
+    """
+    Returns the server-rendered properties of a component, leaving out those without a value so that the
+    component keeps its defaults.
+    """
+    return {prop: initial[f'{component_id}.{prop}'] for prop in props if f'{component_id}.{prop}' in initial}
+
+
+def layout(**kwargs: Any) -> html.Div:
+    """
+    Builds the page on each visit, for the state selected by its URL (see parse_view_state). With
+    CONFIG.SERVER_RENDERED_LAYOUT, the page embeds that view of the dashboard (see render_initial_state), so the
+    first paint needs no callback. Otherwise it starts with empty Stores and placeholder figures, filled in by the
+    callbacks chained from load_drug_approvals_data.
+
+    Args:
+        **kwargs: Query string parameters of the page.
+
+    Returns:
+        html.Div: The page.
+    """
+
+    state = parse_view_state(kwargs)
+    initial = render_initial_state(**state)
+    if state['year'] is not None:
+        # Kept by load_drug_approvals_data when the page is not server-rendered
+        initial.setdefault('year-input.value', state['year'])
+
+    return html.Div(
+        [
+            dcc.Store(data=initial.get('drug-approvals-data.data'), id='drug-approvals-data'),
+            dcc.Store(data=initial.get('drug-approvals-last-update.data'), id='drug-approvals-last-update'),
+            dcc.Store(data=initial.get('filtered-drug-approvals-data.data'), id='filtered-drug-approvals-data'),
+            dcc.Store(id='mouse-position'),
+            dcc.Store(id='grid-refresh'),
+            dcc.Store(id='drug-approvals-refresh'),
+            dcc.Store(id='url-state'),
+            # Progress of the year view when it runs as a background job (see utils.background)
+            dmc.Progress(id='year-view-progress', value=0, size='xs', color='gray', style={'visibility': 'hidden'}),
+            *(
+                [de.EventSource(id='dataset-events', url=CONFIG.NOTIFICATIONS_PATH)]
+                if CONFIG.NOTIFICATIONS_ENABLED else []
+            ),
+            make_modal(),
+            dmc.Grid(
+                [
+                    dmc.Col(
+                        [
+                            dmc.Group(
+                                [
+                                    dmc.Group(
+                                        [
+                                            dmc.Title(
+                                                'Drug Approval Overview for',
+                                                order=3,
+                                                align='justify',
+                                                style={
                                                     'font-family': 'Roboto, Sans Serif',
+                                                    'font-weight': '300'
+                                                }
+
+                                            ),
+                                            dmc.NumberInput(
+                                                label=None,
+                                                id='year-input',
+                                                p=0,
+                                                mt=-3,
+                                                style={"width": "90px"},
+                                                styles={
+                                                    'input': {
+                                                        'background-color': '#F8F8F8',
+                                                        'padding-left': '0',
+                                                        'border': 'none',
+                                                        'font-size': '1.375rem',
+                                                        'font-weight': '300',
+                                                        'font-family': 'Roboto, Sans Serif',
+                                                    },
+                                                    'control': {'border': 'none'}
                                                 },
-                                                'control': {'border': 'none'}
-                                            },
-                                            className='text-underline'
-                                        )
-                                    ],
-                                    position='left',
-                                    spacing=7
-                                ),
-                                header
-                            ],
-                            position='apart'
-                        )
-                    ],
-                    offsetMd=1,
-                    md=10
-                )
-            ],
-            mt='md',
-            mb=20
-        ),
-        dmc.Grid(
-            [
-                dmc.Col(
-                    [
-                        dmc.Grid(
-                            [
-                                dmc.Col(
-                                    [
-                                        dmc.Container(
-                                            [
-                                                dmc.Stack(
-                                                    [
-                                                        dmc.Text(
-                                                            children=[],
-                                                            weight=500,
-                                                            color='rgba(255,255,255,1)',
-                                                            id='total-approvals-count',
-                                                            style={
-                                                                'font-size': '2.375rem'
-                                                            }
-                                                        ),
-                                                        dmc.Text(
-                                                            'approvals',
-                                                            transform='uppercase',
-                                                            color='white',
-                                                            m=0,
-                                                            style={
-                                                                'font-size': '0.85rem'
-                                                            }
-                                                        ),
-                                                    ],
-                                                    spacing=0,
-                                                    align='center'
-                                                )
-                                            ],
-                                            px=0,
-                                            style={
-                                                'background': 'linear-gradient(135deg, #3c8d5d 0%, #c8e6c9 100%)',
-                                                'border-radius': '10px',
-                                                'height': '100%',
-                                                'display': 'flex',
-                                                'flex-direction': 'column',
-                                                'justify-content': 'center'
-                                            }
-                                        )
-                                    ],
-                                    xl=2
-                                ),
-                                *[
+                                                className='text-underline',
+                                                **initial_props(initial, 'year-input', 'min', 'max', 'value')
+                                            )
+                                        ],
+                                        position='left',
+                                        spacing=7
+                                    ),
+                                    header
+                                ],
+                                position='apart'
+                            )
+                        ],
+                        offsetMd=1,
+                        md=10
+                    )
+                ],
+                mt='md',
+                mb=20
+            ),
+            dmc.Grid(
+                [
+                    dmc.Col(
+                        [
+                            dmc.Grid(
+                                [
                                     dmc.Col(
                                         [
-                                            make_container(
-                                                children=[
-                                                    dmc.Center(
-                                                        [assemble_kpi_panel(item)]
+                                            dmc.Container(
+                                                [
+                                                    dmc.Stack(
+                                                        [
+                                                            dmc.Text(
+                                                                children=initial.get(
+                                                                    'total-approvals-count.children', []
+                                                                ),
+                                                                weight=500,
+                                                                color='rgba(255,255,255,1)',
+                                                                id='total-approvals-count',
+                                                                style={
+                                                                    'font-size': '2.375rem'
+                                                                }
+                                                            ),
+                                                            dmc.Text(
+                                                                'approvals',
+                                                                transform='uppercase',
+                                                                color='white',
+                                                                m=0,
+                                                                style={
+                                                                    'font-size': '0.85rem'
+                                                                }
+                                                            ),
+                                                        ],
+                                                        spacing=0,
+                                                        align='center'
                                                     )
                                                 ],
-                                                extra_styles={
+                                                px=0,
+                                                style={
+                                                    'background': 'linear-gradient(135deg, #3c8d5d 0%, #c8e6c9 100%)',
+                                                    'border-radius': '10px',
+                                                    'height': '100%',
                                                     'display': 'flex',
                                                     'flex-direction': 'column',
-                                                    'justify-content': 'center',
-                                                    'align-items': 'center'
-                                                },
-                                                pl=0,
-                                                pt=0,
-                                                style_height='100%'
+                                                    'justify-content': 'center'
+                                                }
                                             )
                                         ],
-                                        xl=2.5
-                                    ) for item in kpi_items
-                                ]
-                            ],
-                            mb=MARGIN_BOTTOM
-                        ),
-                        dmc.Grid(
-                            [
-                                dmc.Col(
-                                    [
-                                        make_container(
-                                            children=[
-                                                dmc.Text(
-                                                    children=[
-                                                        'Total Approvals'
-                                                    ],
-                                                    id='total-approvals-title',
-                                                    size='sm',
-                                                    mb='lg'
-                                                ),
-                                                add_loading_overlay(
-                                                    elements=[
-                                                        dcc.Graph(
-                                                            id='yearly-approvals-fig',
-                                                            figure=plot_approvals_year(
-                                                                pd.DataFrame(columns=['Date of Approval', 'total'])
-                                                            ),
-                                                            style={'height': '250px', 'width': '95%',
-                                                                   'margin-left': '10px'},
-                                                            config=FIG_CONFIG,
-                                                            responsive=True
-                                                        )
-                                                    ]
-                                                )
-                                            ],
-                                            style_height='300px'
-                                        )
-                                    ],
-                                    lg=8
-                                ),
-                                dmc.Col(
-                                    [
-                                        make_container(
-                                            children=[
-                                                dmc.Text(
+                                        xl=2
+                                    ),
+                                    *[
+                                        dmc.Col(
+                                            [
+                                                make_container(
                                                     children=[
-                                                        'Top 5 Drug Types'
-                                                    ],
-                                                    size='sm',
-                                                    mb='sm',
-                                                ),
-                                                add_loading_overlay(
-                                                    elements=[
-                                                        dcc.Graph(
-                                                            id='drug-type-fig',
-                                                            figure=plot_drug_type(
-                                                                df=pd.DataFrame(columns=['drug_type', 'total'])
-                                                            ),
-                                                            config=FIG_CONFIG,
-                                                            style={'height': '250px'},
-                                                            clear_on_unhover=True,
-                                                            responsive=True
-                                                        )
-                                                    ]
-                                                ),
-                                                dcc.Tooltip(
-                                                    id='tooltip-drug-type-fig',
-                                                    direction='bottom',
-                                                    background_color='rgba(0,0,0,0.9)',
-                                                    border_color='rgba(0,0,0,0.9)',
-                                                    style={
-                                                        'border-radius': '4px',
-                                                        'color': 'white',
-                                                        'font-family': '"Open Sans", "Verdana", "Arial", sans-serif',
-                                                        'font-size': '0.75rem',
-                                                        'padding': '0',
-                                                        'width': '175px',
-                                                        'height': '25px',
-                                                        'display': 'flex',
-                                                        'flex-direction': 'column',
-                                                        'justify-content': 'center'
-                                                    },
-                                                )
-                                            ],
-                                            style_height='300px',
-                                        )
-                                    ],
-                                    lg=4
-                                )
-                            ],
-                            mb=MARGIN_BOTTOM
-                        ),
-                        dmc.Grid(
-                            [
-                                dmc.Col(
-                                    [
-                                        make_container(
-                                            children=[
-                                                dmc.Group(
-                                                    [
-                                                        dmc.Text('Approval Distribution by Category', size='sm'),
-                                                        html.Div(
+                                                        dmc.Center(
                                                             [
-                                                                dmc.Group(
-                                                                    [
-                                                                        dmc.Select(
-                                                                            label=None,
-                                                                            placeholder=None,
-                                                                            id="item-select",
-                                                                            value="disease_type",
-                                                                            dropdownPosition='top',
-                                                                            data=[
-                                                                                {"value": "disease_type",
-                                                                                 "label": "Disease"},
-                                                                                {"value": "drug_type", "label": "Drug"}
-                                                                            ],
-                                                                            style={"width": 100},
-                                                                        ),
-                                                                        dmc.NumberInput(
-                                                                            label=None,
-                                                                            id='n-companies',
-                                                                            value=5,
-                                                                            min=5,
-                                                                            max=15,
-                                                                            style={"width": 60}
-                                                                        ),
-                                                                    ]
+                                                                assemble_kpi_panel(
+                                                                    item, initial.get(f'{item["label"]}-kpi.children')
                                                                 )
                                                             ]
                                                         )
                                                     ],
-                                                    position='apart'
-                                                ),
-                                                add_loading_overlay(
-                                                    [
-                                                        dcc.Graph(
-                                                            id='company-stacked-fig',
-                                                            config=FIG_CONFIG,
-                                                            figure=plot_stacked_item_company(
-                                                                df=pd.DataFrame(columns=['total', 'Company', 'drug_type']),
-                                                                item_type='drug_type',
-                                                                companies_sorted=list()
-                                                            ),
-                                                            responsive=True,
-                                                            style={'height': '75%', 'margin-top': '30px'}
-                                                        )
-                                                    ],
-                                                    extra_styles={'height': '75%'}
+                                                    extra_styles={
+                                                        'display': 'flex',
+                                                        'flex-direction': 'column',
+                                                        'justify-content': 'center',
+                                                        'align-items': 'center'
+                                                    },
+                                                    pl=0,
+                                                    pt=0,
+                                                    style_height='100%'
                                                 )
                                             ],
-                                            style_height='322px'
-                                        )
-                                    ],
-                                    span='auto'
-                                )
-                            ]
-                        )
-                    ],
-                    offsetMd=1,
-                    md=7
-                ),
-                dmc.Col(
-                    [
-                        make_container(
-                            children=[
-                                dmc.Text(None, mb='lg', id='approved-drugs-title', pt=20, pl=25),
-                                dmc.Container(
-                                    [
-                                        dag.AgGrid(
-                                            id='approvals-grid-data',
-                                            className='ag-theme-material',
-                                            style={'height': '100%', 'width': '90%'},
-                                            columnSize='sizeToFit',
-                                            dashGridOptions={'suppressMovableColumns': True},
-                                            defaultColDef={'width': 128, 'resizable': False},
-                                        )
-                                    ],
-                                    px=0,
-                                    style={
-                                        'display': 'flex',
-                                        'justify-content': 'center',
-                                        'align-items': 'center',
-                                        'height': '88%',
-                                        'width': '100%'
-                                    }
-                                )
-                            ],
-                            pt=0, pl=0,
-                            style_height='82.8vh'
-                        )
-                    ],
-                    md=3,
-                )
-            ]
-        )
-    ]
-)
+                                            xl=2.5
+                                        ) for item in kpi_items
+                                    ]
+                                ],
+                                mb=MARGIN_BOTTOM
+                            ),
+                            dmc.Grid(
+                                [
+                                    dmc.Col(
+                                        [
+                                            make_container(
+                                                children=[
+                                                    dmc.Text(
+                                                        children=initial.get(
+                                                            'total-approvals-title.children', ['Total Approvals']
+                                                        ),
+                                                        id='total-approvals-title',
+                                                        size='sm',
+                                                        mb='lg'
+                                                    ),
+                                                    add_loading_overlay(
+                                                        elements=[
+                                                            dcc.Graph(
+                                                                id='yearly-approvals-fig',
+                                                                figure=initial.get(
+                                                                    'yearly-approvals-fig.figure',
+                                                                    PLACEHOLDER_FIGURES['yearly-approvals-fig']
+                                                                ),
+                                                                style={'height': '250px', 'width': '95%',
+                                                                       'margin-left': '10px'},
+                                                                config=FIG_CONFIG,
+                                                                responsive=True
+                                                            )
+                                                        ]
+                                                    )
+                                                ],
+                                                style_height='300px'
+                                            )
+                                        ],
+                                        lg=8
+                                    ),
+                                    dmc.Col(
+                                        [
+                                            make_container(
+                                                children=[
+                                                    dmc.Text(
+                                                        children=[
+                                                            'Top 5 Drug Types'
+                                                        ],
+                                                        size='sm',
+                                                        mb='sm',
+                                                    ),
+                                                    add_loading_overlay(
+                                                        elements=[
+                                                            dcc.Graph(
+                                                                id='drug-type-fig',
+                                                                figure=initial.get(
+                                                                    'drug-type-fig.figure',
+                                                                    PLACEHOLDER_FIGURES['drug-type-fig']
+                                                                ),
+                                                                config=FIG_CONFIG,
+                                                                style={'height': '250px'},
+                                                                clear_on_unhover=True,
+                                                                responsive=True
+                                                            )
+                                                        ]
+                                                    ),
+                                                    dcc.Tooltip(
+                                                        id='tooltip-drug-type-fig',
+                                                        direction='bottom',
+                                                        background_color='rgba(0,0,0,0.9)',
+                                                        border_color='rgba(0,0,0,0.9)',
+                                                        style={
+                                                            'border-radius': '4px',
+                                                            'color': 'white',
+                                                            'font-family': '"Open Sans", "Verdana", "Arial", sans-serif',
+                                                            'font-size': '0.75rem',
+                                                            'padding': '0',
+                                                            'width': '175px',
+                                                            'height': '25px',
+                                                            'display': 'flex',
+                                                            'flex-direction': 'column',
+                                                            'justify-content': 'center'
+                                                        },
+                                                    )
+                                                ],
+                                                style_height='300px',
+                                            )
+                                        ],
+                                        lg=4
+                                    )
+                                ],
+                                mb=MARGIN_BOTTOM
+                            ),
+                            dmc.Grid(
+                                [
+                                    dmc.Col(
+                                        [
+                                            make_container(
+                                                children=[
+                                                    dmc.Group(
+                                                        [
+                                                            dmc.Text('Approval Distribution by Category', size='sm'),
+                                                            html.Div(
+                                                                [
+                                                                    dmc.Group(
+                                                                        [
+                                                                            dmc.Select(
+                                                                                label=None,
+                                                                                placeholder=None,
+                                                                                id="item-select",
+                                                                                value=state['item_type'],
+                                                                                dropdownPosition='top',
+                                                                                data=[
+                                                                                    {"value": "disease_type",
+                                                                                     "label": "Disease"},
+                                                                                    {"value": "drug_type", "label": "Drug"}
+                                                                                ],
+                                                                                style={"width": 100},
+                                                                            ),
+                                                                            dmc.NumberInput(
+                                                                                label=None,
+                                                                                id='n-companies',
+                                                                                value=state['n_companies'],
+                                                                                min=MIN_N_COMPANIES,
+                                                                                max=MAX_N_COMPANIES,
+                                                                                style={"width": 60}
+                                                                            ),
+                                                                        ]
+                                                                    )
+                                                                ]
+                                                            )
+                                                        ],
+                                                        position='apart'
+                                                    ),
+                                                    add_loading_overlay(
+                                                        [
+                                                            dcc.Graph(
+                                                                id='company-stacked-fig',
+                                                                config=FIG_CONFIG,
+                                                                figure=initial.get(
+                                                                    'company-stacked-fig.figure',
+                                                                    PLACEHOLDER_FIGURES['company-stacked-fig']
+                                                                ),
+                                                                responsive=True,
+                                                                style={'height': '75%', 'margin-top': '30px'}
+                                                            )
+                                                        ],
+                                                        extra_styles={'height': '75%'}
+                                                    )
+                                                ],
+                                                style_height='322px'
+                                            )
+                                        ],
+                                        span='auto'
+                                    )
+                                ]
+                            )
+                        ],
+                        offsetMd=1,
+                        md=7
+                    ),
+                    dmc.Col(
+                        [
+                            make_container(
+                                children=[
+                                    dmc.Text(
+                                        initial.get('approved-drugs-title.children'),
+                                        mb='lg',
+                                        id='approved-drugs-title',
+                                        pt=20,
+                                        pl=25
+                                    ),
+                                    dmc.Container(
+                                        [
+                                            dag.AgGrid(
+                                                id='approvals-grid-data',
+                                                className='ag-theme-material',
+                                                style={'height': '100%', 'width': '90%'},
+                                                columnSize='sizeToFit',
+                                                columnDefs=GRID_COLUMN_DEFS,
+                                                **GRID_ROW_MODEL_PROPS,
+                                                defaultColDef={'width': 128, 'resizable': False},
+                                                **initial_props(initial, 'approvals-grid-data', 'rowData'),
+                                            )
+                                        ],
+                                        px=0,
+                                        style={
+                                            'display': 'flex',
+                                            'justify-content': 'center',
+                                            'align-items': 'center',
+                                            'height': '88%',
+                                            'width': '100%'
+                                        }
+                                    )
+                                ],
+                                pt=0, pl=0,
+                                style_height='82.8vh'
+                            )
+                        ],
+                        md=3,
+                    )
+                ]
+            )
+        ]
+    )
 
 
-@callback(
-    Output('filtered-drug-approvals-data', 'data'),
-    Output('total-approvals-title', 'children'),
-    Output('approved-drugs-title', 'children'),
+@heavy_callback(
+    *YEAR_VIEW_OUTPUTS,
     Input('year-input', 'value'),
-    State('drug-approvals-data', 'data')
+    Input('drug-approvals-refresh', 'data'),
+    State('drug-approvals-data', 'data'),
+    State('drug-approvals-last-update', 'data'),
+    progress=[Output('year-view-progress', 'value')],
+    running=[(Output('year-view-progress', 'style'), {'visibility': 'visible'}, {'visibility': 'hidden'})],
+    prevent_initial_call=CONFIG.SERVER_RENDERED_LAYOUT
 )
-def update_drug_approvals_data(year: int, data: dict):
+@traced
+def update_drug_approvals_data(
+        year: int,
+        refresh: dict,
+        data: dict,
+        last_update: str,
+        set_progress: ProgressSetter = None
+) -> tuple:
     """
-    Filters drug approvals data based on the selected year and converts it to a dictionary suitable for Dash components.
+    Filters drug approvals data based on the selected year and updates every year-dependent component in one pass:
+    titles, total count, KPI panel, monthly approvals chart, drug type chart and approvals grid.
+
+    The year view is computed once per (dataset version, year) and shared by all outputs, instead of each
+    component deserialising the filtered data and aggregating it on its own.
 
     Args:
         year (int): The year selected by the user.
-        data (dict): The original drug approvals data..
+        refresh (dict): The last new version of the dataset pushed by the server (see apply_dataset_event), with
+            the years it changes.
+        data (dict): The original drug approvals data (a server-side handle or a list of records).
+        last_update (str): The last update date of the dataset, shown in the KPI panel.
+        set_progress (ProgressSetter): Reports the progress of the background job, None when the callback runs in
+            the request (see utils.background). A new year cancels the job of the previous one.
 
     Returns:
-        tuple[list[dict], str, str]:
-            - A list of dictionaries representing the filtered drug approvals data for the selected year.
-            - A formatted string indicating the total number of approvals for the selected year.
-            - A formatted string indicating the title for the list of approved drugs in the selected year.
+        tuple: The filtered drug approvals data (handle or records) for the downstream components, the titles,
+        the total number of approvals, the four KPI values, the two figures and the grid rows (left unchanged with
+        the infinite row model, whose blocks are fetched by update_grid_rows_block).
     """
 
-    df = pd.DataFrame(data)
-    df_filtered = df.query('year == @year')
-    return df_filtered.to_dict('records'), f'Total Approvals in {year}', f'Approved Drugs in {year}'
+    if year is None or data is None:
+        raise PreventUpdate
 
+    # A new version which leaves the rows of the selected year unchanged only changes the update date
+    if refresh is not None and dash.ctx.triggered_id == 'drug-approvals-refresh':
+        if refresh['years'] is not None and year not in refresh['years']:
+            return (*[no_update] * 7, last_update, *[no_update] * 3)
 
-@callback(
-    Output('total-approvals-count', 'children'),
-    Input('filtered-drug-approvals-data', 'data'),
-    State('year-input', 'value'),
-    prevent_initial_call=True
-)
-def update_count_total_approvals(data: dict, year: int) -> int:
-    """
-    Computes the total number of drug approvals for the selected year and updates the display.
+    return render_year(year, data, last_update, set_progress)
 
-    Args:
-        data (dict): The filtered drug approvals data.
-        year (int): The year selected by the user.
 
-    Returns:
-        int: The total number of drug approvals for the selected year.
+def render_year(year: int, data: dict, last_update: str, set_progress: ProgressSetter = None) -> tuple:
     """
-
-    df = pd.DataFrame(data)
-    df_filtered = df.query('year == @year')
-    return df_filtered.shape[0]
-
-
-@callback(
-    Output('top-company-kpi', 'children'),
-    Output('main-focus-kpi', 'children'),
-    Output('leading-class-kpi', 'children'),
-    Output('last-updated-kpi', 'children'),
-    Input('filtered-drug-approvals-data', 'data'),
-    State('drug-approvals-last-update', 'data'),
-    prevent_initial_call=True
-)
-def update_kpi_panel(data, last_update):
+    Computes the outputs of update_drug_approvals_data (YEAR_VIEW_OUTPUTS) for a year, for the callback and for
+    the server-rendered page.
     """
-    Processes drug approval data to update KPIs for display in the dashboard.
 
-    Args:
-        data (List[Dict[str, Any]]): The data from the client-side store that includes drug approvals.
+    filtered_data = data_store.filter_store_payload(data, year)
+    view = year_view.get_year_view(filtered_data)
+    report_progress(set_progress, 1, 3)
 
-    Returns:
-        Tuple containing KPI values for the top company, main focus, leading drug class, and the last updated timestamp.
-    """
-    df = pd.DataFrame(data)
+    # Creates a tooltip for names that were shortened at ingest to fit in the panel.
     all_kpis = []
+    for col in year_view.KPI_COLUMNS:
+        if view.top_items[col] is None:
+            all_kpis.append('-')
+            continue
 
-    # Process top items for each KPI
-    for col in ['Company', 'disease_type', 'drug_type']:
-        top_item = df.groupby(col).size().reset_index(name='total').sort_values(by='total', ascending=False)
-        top_item_name = top_item.iloc[0][col]
-
-        # Clean up disease_type names by removing specified suffixes
-        if col == 'disease_type':
-            for suffix in SUFFIXES_TO_DELETE:
-                if suffix in top_item_name:
-                    top_item_name = top_item_name.replace(suffix, '')
-                    break
-
-        # Creates a tooltip for names that are too long or need additional context for display.
-        if 'Reproductive' in top_item_name:
+        top_item_name, short_name = view.top_items[col]
+        if short_name != top_item_name:
             top_item_name = dmc.Tooltip(
-                ['Reprod. Sys.'],
+                [short_name],
                 label=top_item_name,
                 transition='fade',
                 position='bottom',
                 withArrow=True
             )
-
-        elif len(top_item_name.split()) > 1:
-            split_name = top_item_name.split()
-            top_item_name = dmc.Tooltip(
-                [f'{split_name[0]} {split_name[1][:5 if col != "Company" else 4]}.'],
-                label=top_item_name,
-                transition='fade',
-                position='bottom',
-                withArrow=True
-            )
-
         all_kpis.append(top_item_name)
 
-    return *all_kpis, last_update
-
-
-@callback(
-    Output('yearly-approvals-fig', 'figure'),
-    Input('filtered-drug-approvals-data', 'data'),
-    prevent_initial_call=True
-)
-def update_yearly_approvals_fig(data: dict) -> Figure:
-    """
-    Callback to update the yearly approvals figure.
-
-    Args:
-        data (dict): The data containing drug approvals.
-
-    Returns:
-        Figure: Plotly figure of the yearly drug approvals chart.
-
-    """
-
-    # Convert data to DataFrame and parse dates
-    df = pd.DataFrame(data)
-    df['Date of Approval'] = pd.to_datetime(df['Date of Approval'], errors='coerce')
-
-    # Group data by month and calculate total approvals
-    approvals_per_year = df.groupby(df['Date of Approval'].dt.to_period('M')).size().reset_index(name='total')
-    approvals_per_year['Date of Approval'] = approvals_per_year['Date of Approval'].dt.to_timestamp()
-
-    return plot_approvals_year(approvals_per_year)
+    yearly_fig = FIGURE_CACHE.get_or_build(
+        view.cache_key('yearly-approvals'), lambda: plot_approvals_year(view.monthly)
+    )
+    report_progress(set_progress, 2, 3)
+    drug_type_fig = FIGURE_CACHE.get_or_build(view.cache_key('drug-type'), lambda: plot_drug_type(view.drug_types))
+    report_progress(set_progress, 3, 3)
+
+    return (
+        filtered_data,
+        f'Total Approvals in {year}',
+        f'Approved Drugs in {year}',
+        view.total,
+        *all_kpis,
+        last_update,
+        yearly_fig,
+        drug_type_fig,
+        view.grid_rows if CONFIG.GRID_ROW_MODEL != 'infinite' else no_update
+    )
 
 
-@callback(
-    Output('drug-type-fig', 'figure'),
-    Input('filtered-drug-approvals-data', 'data'),
+# Clientside callback to write the selected year, item type and number of companies to the query string of the
+# page (without reloading it or adding a history entry), so that the view can be bookmarked and shared.
+clientside_callback(
+    ClientsideFunction(namespace='clientside', function_name='update_url_state'),
+    Output('url-state', 'data'),
+    Input('year-input', 'value'),
+    Input('item-select', 'value'),
+    Input('n-companies', 'value'),
     prevent_initial_call=True
 )
-def update_drug_type_fig(data: dict) -> Figure:
-    """
-    Callback to update the drug type figure.
-
-    Args:
-        data (dict): The data containing drug approvals categorized by drug type.
-
-    Returns:
-        Figure: Plotly figure of the top 5 drug types by approval count.
-    """
-
-    # Group and count approvals by drug type, then take the top 5
-    df = pd.DataFrame(data)
-    approvals_per_drug_type = df.groupby('drug_type').size().reset_index(name='total')
-    approvals_per_drug_type = approvals_per_drug_type.sort_values(by='total', ascending=False)[:5]
-
-    return plot_drug_type(approvals_per_drug_type)
 
 
 # Clientside callback to capture and store the mouse position whenever a hover event is triggered on the drug-type
@@ -590,98 +782,126 @@ def update_tooltip_drug_fig(hover_data: dict) -> tuple:
     return False, no_update
 
 
-@callback(
+@heavy_callback(
     Output('company-stacked-fig', 'figure'),
     Input('filtered-drug-approvals-data', 'data'),
     Input('item-select', 'value'),
     Input('n-companies', 'value'),
+    # As a background job, the chart of the previous year is dropped as soon as another year is selected
+    cancel=[Input('year-input', 'value')],
     prevent_initial_call=True
 )
-def update_stacked_fig(data: dict, item_type: str, n_companies: int) -> Figure:
+@traced
+def update_stacked_fig(data: dict, item_type: str, n_companies: int, set_progress: ProgressSetter = None) -> dict:
     """
     Update and return the stacked bar chart figure based on the selected item type and number of companies.
     This function processes the data to create a figure showing the number of approvals per company,
     segmented by drug or disease type, for the top N companies.
     """
 
-    # Convert input data into a DataFrame and group by company and item type to count approvals
-    df = pd.DataFrame(data)
-    item_per_company = df.groupby(['Company', item_type]).size().reset_index(name='total')
+    return render_stacked_fig(data, item_type, n_companies)
+
 
-    # Calculate the total number of approvals per company and sort these companies by the total
-    # approvals in descending order
-    total_approvals_company = item_per_company.groupby('Company')['total'].sum().reset_index(name='total')
-    total_approvals_company_sorted = total_approvals_company.sort_values(by=['total', 'Company'], ascending=False)[
-                                     :n_companies]
+def render_stacked_fig(data: dict, item_type: str, n_companies: int) -> Figure:
+    """
+    Returns the company chart of update_stacked_fig, for the callback and for the server-rendered page.
+    """
 
-    # Filter the data to include only the top N companies for visualization
-    companies_sorted = total_approvals_company_sorted['Company'].to_list()
-    item_per_company_filtered = item_per_company[item_per_company['Company'].isin(companies_sorted)]
+    view = year_view.get_year_view(data)
 
-    return plot_stacked_item_company(
-        df=item_per_company_filtered,
-        item_type=item_type,
-        companies_sorted=companies_sorted
+    def build_figure() -> Figure:
+        # Read the approvals of the top N companies, split by item type, from the shared year view
+        item_per_company_filtered, companies_sorted = view.item_per_company(item_type, n_companies)
+
+        return plot_stacked_item_company(
+            df=item_per_company_filtered,
+            item_type=item_type,
+            companies_sorted=companies_sorted
+        )
+
+    # Repeated views of the same (dataset version, year, item type, number of companies) skip both the
+    # aggregation and the figure building
+    return FIGURE_CACHE.get_or_build(view.cache_key('company-stacked', item_type, n_companies), build_figure)
+
+
+if CONFIG.GRID_ROW_MODEL == 'infinite':
+
+    # Clientside callback to drop the blocks cached by the grid when the selected year changes, which makes the
+    # grid request its visible block again.
+    clientside_callback(
+        ClientsideFunction(namespace='clientside', function_name='purge_infinite_grid'),
+        Output('grid-refresh', 'data'),
+        Input('filtered-drug-approvals-data', 'data'),
+        State('approvals-grid-data', 'id'),
+        prevent_initial_call=True
     )
 
+    @callback(
+        Output('approvals-grid-data', 'getRowsResponse'),
+        Input('approvals-grid-data', 'getRowsRequest'),
+        State('filtered-drug-approvals-data', 'data'),
+        prevent_initial_call=True
+    )
+    @traced
+    def update_grid_rows_block(request: dict, data: dict) -> dict:
+        """
+        Serves a block of rows to the approvals grid when it uses the infinite row model.
 
-@callback(
-    Output('approvals-grid-data', 'rowData'),
-    Output('approvals-grid-data', 'columnDefs'),
-    Input('filtered-drug-approvals-data', 'data'),
-    prevent_initial_callback=True
-)
-def update_grid_approvals(data):
-    """
-    Updates the data and column definitions for an Ag-Grid component in a Dash application.
+        Rows are sorted on the server, once per (year view, sort model), and only the requested block is sent.
 
-    This callback fetches updated drug approval data and configures the grid to display this data.
-    It also defines how the 'Details' column should render using a custom Dash-Mantine component for interactivity.
+        Args:
+            request (dict): The getRowsRequest of the grid, with 'startRow', 'endRow' and 'sortModel'.
+            data (dict): The filtered drug approvals data.
 
-    Args:
-        data (List[Dict]): List of dictionaries where each dictionary contains data of a single drug approval.
+        Returns:
+            dict: The getRowsResponse, with the rows of the block and the total number of rows.
+        """
 
-    Returns:
-        Tuple[List[Dict], List[Dict]]: A tuple where the first element is the list of records for the grid's rowData
-        and the second element is the list of dictionaries defining column properties for the grid.
-    """
+        if request is None:
+            raise PreventUpdate
 
-    df = pd.DataFrame(data)
+        # The grid may request its first block before the year view exists
+        if data is None:
+            return {'rowData': [], 'rowCount': 0}
 
-    # Initialize 'Details' column to prepare for interactive elements
-    df['Details'] = ''
+        view = year_view.get_year_view(data)
+        return get_rows_block(view.sorted_grid(sort_key(request.get('sortModel'), view.grid_frame.columns)), request)
 
-    # Filter the DataFrame to ensure it's sorted by date and duplicates are removed
-    cols = ['Date of Approval', 'drug_name', 'Details']
-    filtered_df = df[cols].sort_values(by='Date of Approval', ascending=False).drop_duplicates()
-    filtered_df['Date of Approval'] = filtered_df['Date of Approval'].str.split('T').str[0]
 
-    # Set up column definitions for the grid, including custom renderers for interactive functionality
-    column_defs = [
-        {
-            'headerName': 'Date',
-            'field': 'Date of Approval',
-        },
-        {
-            'headerName': 'Drug Name',
-            'field': 'drug_name',
-        },
-        {
-            'field': 'Details',
-            'cellRenderer': 'DMC_ActionIcon',
-            'cellRendererParams': {
-                'icon': 'f7:ellipsis-circle-fill',
-                'iconColor': '#bfbfbf',
-                'iconWidth': '20',
-                'iconHeight': '20',
-                'variant': 'subtle',
-                'marginTop': '8px',
-                'marginLeft': '6px',
-            }
-        },
-    ]
+if CONFIG.NOTIFICATIONS_ENABLED:
+
+    @callback(
+        Output('drug-approvals-data', 'data', allow_duplicate=True),
+        Output('drug-approvals-last-update', 'data', allow_duplicate=True),
+        Output('drug-approvals-refresh', 'data'),
+        Input('dataset-events', 'message'),
+        prevent_initial_call=True
+    )
+    @traced
+    def apply_dataset_event(message: str) -> tuple:
+        """
+        Switches the dashboard to a new version of the dataset pushed by the server (see utils.notifications).
+
+        Args:
+            message (str): The event: data type, version, added rows and the years it changes.
+
+        Returns:
+            tuple: The Store content of the new version, its last update date and the refresh signal of
+            update_drug_approvals_data, which only recomputes the year view if the selected year changed.
+        """
+
+        event = loads(message)
+        if event['data_type'] != 'NEW_DRUG_APPROVALS_FILENAME':
+            raise PreventUpdate
+
+        snapshot = loading_data.get_snapshot_by_version(event['version'])
+        if snapshot is None:
+            # The worker answering this request may not have loaded the new version yet
+            snapshot = loading_data.get_snapshot(event['data_type'], 'csv')
+        years = event['years'] if snapshot.version == event['version'] else None
 
-    return filtered_df.to_dict('records'), column_defs
+        refresh = {'version': snapshot.version, 'years': years}
+        return data_store.make_store_payload(snapshot), snapshot.last_update, refresh
 
 
 @callback(
@@ -695,13 +915,12 @@ def update_grid_approvals(data):
     Output('modal-company', 'children'),
     Input('approvals-grid-data', 'cellRendererData'),
     State('modal-detailed-drug', 'opened'),
-    State('filtered-drug-approvals-data', 'data'),
     prevent_initial_call=True
 )
+@traced
 def toggle_modal_drug(
         clicked_grid_data: dict,
-        opened: bool,
-        approvals_data: list
+        opened: bool
 ) -> tuple:
     """
     Toggles the drug detail modal, updates the content based on the clicked row in the drug approvals grid.
@@ -709,7 +928,6 @@ def toggle_modal_drug(
     Args:
         clicked_grid_data (dict): Data containing the clicked row information, such as drug name and date of approval.
         opened (bool): Current state of the modal, whether it is open or closed.
-        approvals_data (list): List of dictionaries representing the drug approvals data.
 
     Returns:
         tuple: Returns multiple outputs to update the state of the modal and its content. This includes:
@@ -725,33 +943,33 @@ def toggle_modal_drug(
     drug_name = clicked_grid_data['value']['drugName']
     approval_date = clicked_grid_data['value']['dateApproval']
 
-    # Filtering the DataFrame for the selected drug based on drug name and approval date
+    # Fetching the selected drug from the server-side detail index, keyed by drug name and approval date
     if drug_name:
-        df = pd.DataFrame(approvals_data)
-        df_filtered = df.query(
-            'drug_name == @drug_name and `Date of Approval`.str.startswith(@approval_date)').drop_duplicates().iloc[0]
+        drug_record = data_store.get_record('NEW_DRUG_APPROVALS_FILENAME', 'csv', (drug_name, approval_date))
+        if drug_record is None:
+            raise PreventUpdate
 
         # Preparing the modal title with drug name and generic name
         modal_title = [
             drug_name,
             dmc.Text(
-                df_filtered['drug_generic_name'] or '-',
+                drug_record['drug_generic_name'] or '-',
                 size=15,
                 style={'font-style': 'italic'}
             )
         ]
         # Generating badges for disease type, drug type, and mode of administration
         all_badges = [
-            df_filtered['disease_type'] or '-',
-            df_filtered['drug_type'] or '-',
-            df_filtered['mode_administration'] or '-'
+            drug_record['disease_type'] or '-',
+            drug_record['drug_type'] or '-',
+            drug_record['mode_administration'] or '-'
         ]
 
         # Setting the drug description or a default message if none is available
-        description_drug = df_filtered['description'] or 'No description provided for this medication.'
+        description_drug = drug_record['description'] or 'No description provided for this medication.'
 
         # Setting treatment and company information for the footer of the modal
-        footer_modal = [df_filtered['Treatment for'] or '-', df_filtered['Company'] or '-']
+        footer_modal = [drug_record['Treatment for'] or '-', drug_record['Company'] or '-']
 
         return not opened, modal_title, *all_badges, description_drug, *footer_modal
 
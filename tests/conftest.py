@@ -0,0 +1,14 @@
+import pytest
+
+import app
+
+# A year without approvals in the dataset
+EMPTY_YEAR = 1900
+
+
+@pytest.fixture
+def client():
+    client = app.server.test_client()
+    # The callbacks, including the routing callback of Dash pages, are registered by the first request
+    client.get('/')
+    return client
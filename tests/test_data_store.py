@@ -0,0 +1,39 @@
+import copy
+
+import pytest
+from dash.exceptions import PreventUpdate
+
+from utils import data_store, loading_data
+
+
+@pytest.fixture
+def payload():
+    snapshot = loading_data.get_snapshot('NEW_DRUG_APPROVALS_FILENAME', 'csv')
+    return data_store.encode_columnar(snapshot.data.drop(columns=data_store.DETAIL_COLUMNS).head(20))
+
+
+def column(payload, kind):
+    return next(item for item in payload['columns'] if item['kind'] == kind)
+
+
+def test_columnar_round_trip(payload):
+    df = data_store.decode_columnar(payload)
+    assert len(df) == 20
+    assert [item['name'] for item in payload['columns']] == list(df.columns)
+
+
+@pytest.mark.parametrize('tamper', [
+    lambda payload: column(payload, 'category').update(codes=[10 ** 6] * payload['length']),
+    lambda payload: column(payload, 'category').update(codes=[-2] * payload['length']),
+    lambda payload: column(payload, 'category').update(codes=['a'] * payload['length']),
+    lambda payload: column(payload, 'date').update(missing=[payload['length']]),
+    lambda payload: column(payload, 'date').update(missing=[-1]),
+    lambda payload: column(payload, 'integer').update(missing=[10 ** 9]),
+    lambda payload: payload.update(length=payload['length'] + 1),
+    lambda payload: payload['columns'][0].pop('kind'),
+])
+def test_invalid_columnar_payload_is_rejected(payload, tamper):
+    payload = copy.deepcopy(payload)
+    tamper(payload)
+    with pytest.raises(PreventUpdate):
+        data_store.decode_columnar(payload)
@@ -0,0 +1,27 @@
+import pandas as pd
+
+from utils.grid_blocks import get_rows_block, sort_key, sort_rows
+
+FRAME = pd.DataFrame({
+    'Date of Approval': ['03/01/2024', '02/01/2024', '01/01/2024'],
+    'drug_name': ['b', 'c', 'a'],
+    'Details': ['', '', ''],
+})
+
+
+def test_sort_key_ignores_unknown_columns():
+    sort_model = [
+        {'colId': 'unknown', 'sort': 'asc'},
+        {'colId': 'drug_name', 'sort': 'desc'},
+        {'colId': 'drug_name', 'sort': 'asc'},
+        {'colId': 'Details', 'sort': 'sideways'},
+        'drug_name',
+    ]
+    assert sort_key(sort_model, FRAME.columns) == (('drug_name', 'desc'),)
+
+
+def test_rows_block_with_unknown_sort_column():
+    key = sort_key([{'colId': 'unknown', 'sort': 'asc'}], FRAME.columns)
+    block = get_rows_block(sort_rows(FRAME, key), {'startRow': 0, 'endRow': 2})
+    assert [row['drug_name'] for row in block['rowData']] == ['b', 'c']
+    assert block['rowCount'] == 3
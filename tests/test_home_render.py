@@ -0,0 +1,54 @@
+import pytest
+
+import app
+from config import CONFIG
+from pages import home
+from tests.conftest import EMPTY_YEAR
+from utils import data_store, loading_data
+
+
+def page_content_request(search: str = '') -> dict:
+    """
+    Body of the routing callback request which renders the home page, as sent by the browser on a page view.
+    """
+    output = next(key for key in app.app.callback_map if '_pages_content.children' in key)
+    return {
+        'output': output,
+        'outputs': [
+            {'id': item.rsplit('.', 1)[0], 'property': item.rsplit('.', 1)[1]}
+            for item in output.strip('.').split('...')
+        ],
+        'inputs': [
+            {'id': '_pages_location', 'property': 'pathname', 'value': '/'},
+            {'id': '_pages_location', 'property': 'search', 'value': search},
+        ],
+        'state': [],
+        'changedPropIds': ['_pages_location.pathname'],
+    }
+
+
+@pytest.mark.parametrize('mode', ['handle', 'columnar', 'records'])
+def test_render_year_without_approvals(monkeypatch, mode):
+    monkeypatch.setattr(CONFIG, 'DATA_STORE_MODE', mode)
+    snapshot = loading_data.get_snapshot('NEW_DRUG_APPROVALS_FILENAME', 'csv')
+
+    outputs = dict(zip(
+        [f'{output.component_id}.{output.component_property}' for output in home.YEAR_VIEW_OUTPUTS],
+        home.render_year(EMPTY_YEAR, data_store.make_store_payload(snapshot), snapshot.last_update)
+    ))
+
+    assert outputs['total-approvals-count.children'] == 0
+    assert outputs['top-company-kpi.children'] == '-'
+    assert outputs['approvals-grid-data.rowData'] == []
+
+
+@pytest.mark.parametrize('mode', ['handle', 'columnar', 'records'])
+def test_page_renders_year_without_approvals(monkeypatch, client, mode):
+    monkeypatch.setattr(CONFIG, 'DATA_STORE_MODE', mode)
+    monkeypatch.setattr(CONFIG, 'SERVER_RENDERED_LAYOUT', True)
+    monkeypatch.setattr(home.year_view, 'year_bounds', lambda df: (EMPTY_YEAR, EMPTY_YEAR, EMPTY_YEAR))
+
+    response = client.post('/_dash-update-component', json=page_content_request())
+
+    assert response.status_code == 200
+    assert f'Total Approvals in {EMPTY_YEAR}' in response.get_data(as_text=True)
@@ -0,0 +1,49 @@
+import dataclasses
+from datetime import datetime
+
+import pytest
+
+from pages import home
+from utils import http_cache, loading_data, year_view
+
+QUERY = '?year=2020&item_type=drug_type&n_companies=10'
+
+# Sent by browsers, which makes the compression suffix the ETag with its algorithm
+ACCEPT_ENCODING = {'Accept-Encoding': 'br, gzip'}
+
+
+@pytest.mark.parametrize('headers', [{}, ACCEPT_ENCODING])
+def test_view_is_revalidated_without_computing_it(monkeypatch, client, headers):
+    first = client.get(f'/view{QUERY}', headers=headers)
+    assert first.status_code == 200
+
+    calls = []
+    get_year_view, render_view = year_view.get_year_view, home.render_view
+    monkeypatch.setattr(year_view, 'get_year_view', lambda payload: calls.append(payload) or get_year_view(payload))
+    monkeypatch.setattr(home, 'render_view', lambda *args, **kwargs: calls.append(args) or render_view(*args, **kwargs))
+
+    second = client.get(f'/view{QUERY}', headers={**headers, 'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 304
+    assert second.headers['ETag'] == first.headers['ETag']
+    assert calls == []
+
+
+def test_view_etag_depends_on_the_state(client):
+    etags = {client.get(f'/view{query}').headers['ETag'] for query in [QUERY, '?year=2021', '?year=2020']}
+    assert len(etags) == 3
+
+
+def test_view_etag_depends_on_the_update_and_the_default_year(monkeypatch):
+    snapshot = loading_data.get_snapshot('NEW_DRUG_APPROVALS_FILENAME', 'csv')
+    state = home.parse_view_state({})
+    etag = http_cache.view_etag(snapshot, state)
+
+    assert http_cache.view_etag(dataclasses.replace(snapshot, last_update='Jan 01, 2000'), state) != etag
+    assert http_cache.view_etag(snapshot, {**state, 'year': datetime.now().year}) == etag
+    assert http_cache.view_etag(snapshot, {**state, 'year': datetime.now().year - 1}) != etag
+
+
+def test_page_is_revalidated(client):
+    first = client.get('/_dash-layout')
+    second = client.get('/_dash-layout', headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 304
@@ -0,0 +1,22 @@
+import app
+from utils import metrics
+from utils.metrics import UNKNOWN_CALLBACK, Metrics, callback_name
+
+
+def test_unknown_outputs_share_one_label(client):
+    n_names = len(metrics._CALLBACK_NAMES)
+    for output in ['junk-0.children', 'junk-1.children', ['not', 'a', 'string']]:
+        assert callback_name(app.app, output) == UNKNOWN_CALLBACK
+    assert len(metrics._CALLBACK_NAMES) == n_names
+
+    output = next(key for key in app.app.callback_map if key.startswith('..drug-approvals-data.data'))
+    assert callback_name(app.app, output) == 'load_drug_approvals_data'
+
+
+def test_label_values_are_escaped():
+    registry = Metrics()
+    registry.inc('dash_callback_requests_total', (('callback', 'x"} 1\nfake_metric{a="b\\'),))
+
+    lines = registry.render().splitlines()
+    assert not any(line.startswith('fake_metric') for line in lines)
+    assert 'dash_callback_requests_total{callback="x\\"} 1\\nfake_metric{a=\\"b\\\\"} 1' in lines
@@ -0,0 +1,13 @@
+from tests.conftest import EMPTY_YEAR
+from utils import loading_data, year_view
+
+
+def test_year_views_are_memoised_for_the_years_of_the_dataset():
+    snapshot = loading_data.get_snapshot('NEW_DRUG_APPROVALS_FILENAME', 'csv')
+    handle = {'data_type': 'NEW_DRUG_APPROVALS_FILENAME', 'file_type': 'csv', 'version': snapshot.version}
+    year = snapshot.derived['cube'].years[-1]
+
+    assert year_view.get_year_view({**handle, 'year': year}) is year_view.get_year_view({**handle, 'year': year})
+    for unknown_year in [EMPTY_YEAR, 10 ** 9]:
+        assert year_view.get_year_view({**handle, 'year': unknown_year}).total == 0
+    assert set(snapshot.derived['year_views']) <= set(snapshot.derived['cube'].years)
@@ -1,6 +1,83 @@
+import os
+import tempfile
+
 # Default environment that will be used if none is specified (used in config_loader.py)
 DEFAULT_ENVIRONMENT = 'local'
 
+# How datasets travel through dcc.Store components: 'handle' keeps the data on the server and only stores its
+# version, 'columnar' ships the data to the browser as compact dictionary-encoded columns, 'records' ships the
+# full records (used in config.py)
+DEFAULT_DATA_STORE_MODE = 'handle'
+
+# Bounds of the in-process LRU cache of serialised figures (used in config.py)
+DEFAULT_FIGURE_CACHE_MAX_ENTRIES = '256'
+DEFAULT_FIGURE_CACHE_MAX_BYTES = str(32 * 1024 * 1024)
+
+# Cache shared by the gunicorn workers of a host, stored in a local SQLite file. Its directory is private to the
+# user running the app (used in config.py)
+DEFAULT_SHARED_CACHE_ENABLED = 'false'
+DEFAULT_SHARED_CACHE_PATH = os.path.join(
+    tempfile.gettempdir(),
+    f'new_drug_approvals_{os.getuid()}' if hasattr(os, 'getuid') else 'new_drug_approvals',
+    'shared_cache.sqlite3'
+)
+DEFAULT_SHARED_CACHE_TTL = str(24 * 60 * 60)
+
+# Row model of the approvals grid: 'clientSide' sends all the rows of the year at once, 'infinite' lets the grid
+# fetch the visible blocks of rows from the server (used in config.py)
+DEFAULT_GRID_ROW_MODEL = 'clientSide'
+
+# JSON engine of the callback responses and request bodies ('orjson' or 'json'), and compression of the responses
+# larger than COMPRESSION_MIN_SIZE bytes, with the first algorithm accepted by the browser (used in config.py)
+DEFAULT_JSON_ENGINE = 'orjson'
+DEFAULT_COMPRESSION_ENABLED = 'true'
+DEFAULT_COMPRESSION_ALGORITHMS = 'br,gzip'
+DEFAULT_COMPRESSION_MIN_SIZE = '1024'
+
+# Prometheus metrics of the callbacks and of the data loading, served on METRICS_PATH when enabled (used in
+# config.py)
+DEFAULT_METRICS_ENABLED = 'false'
+DEFAULT_METRICS_PATH = '/metrics'
+
+# Profiling of the callbacks: when enabled, the cProfile profiles of the invocations slower than the threshold
+# are saved in PROFILING_DIR (used in config.py)
+DEFAULT_PROFILING_ENABLED = 'false'
+DEFAULT_PROFILING_THRESHOLD_MS = '500'
+DEFAULT_PROFILING_DIR = os.path.join(tempfile.gettempdir(), 'new_drug_approvals_profiles')
+
+# Tracing of the page views: when enabled, the requests of each page view and their spans are kept in memory and
+# served on TRACING_PATH as JSON or as an HTML waterfall (used in config.py)
+DEFAULT_TRACING_ENABLED = 'false'
+DEFAULT_TRACING_PATH = '/traces'
+
+# Hot reload of the datasets: when enabled, a background thread of each process checks the data files every
+# DATA_WATCH_INTERVAL seconds and swaps in the new version of a changed file (used in config.py)
+DEFAULT_DATA_WATCH_ENABLED = 'true'
+DEFAULT_DATA_WATCH_INTERVAL = '60'
+
+# Server-sent events announcing each new version of a dataset to the open dashboards, on NOTIFICATIONS_PATH. Every
+# open dashboard holds a connection, so it requires threaded workers (used in config.py)
+DEFAULT_NOTIFICATIONS_ENABLED = 'false'
+DEFAULT_NOTIFICATIONS_PATH = '/events'
+
+# Server-rendered home page: when enabled, the layout of each visit embeds the default view (current year), so the
+# first paint needs no callback, otherwise the page starts empty and is filled by the callbacks (used in config.py)
+DEFAULT_SERVER_RENDERED_LAYOUT = 'true'
+
+# HTTP caching of the pages, of the layout and of the views served on VIEW_PATH: their GET responses get an ETag
+# and may be reused for HTTP_CACHE_MAX_AGE seconds by browsers and proxies, then revalidated with a 304 (used in
+# config.py)
+DEFAULT_HTTP_CACHE_ENABLED = 'true'
+DEFAULT_HTTP_CACHE_MAX_AGE = '0'
+DEFAULT_VIEW_PATH = '/view'
+
+# Background jobs for the heavy callbacks: when enabled, they run in processes of a disk-backed job manager rather
+# than in the request, and their results are kept in BACKGROUND_CALLBACKS_DIR for BACKGROUND_CALLBACKS_EXPIRE
+# seconds (used in config.py)
+DEFAULT_BACKGROUND_CALLBACKS_ENABLED = 'false'
+DEFAULT_BACKGROUND_CALLBACKS_DIR = os.path.join(tempfile.gettempdir(), 'new_drug_approvals_jobs')
+DEFAULT_BACKGROUND_CALLBACKS_EXPIRE = '86400'
+
 # File and directory names
 DATA_DIRECTORY_NAME = 'data'
 NEW_DRUG_APPROVALS_FILENAME = 'new_drug_approvals.csv'
\ No newline at end of file
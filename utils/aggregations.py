@@ -0,0 +1,132 @@
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+from pandas import DataFrame
+
+
+class ApprovalsCube:
+    """
+    Count cube of drug approvals over (year, month, Company, drug_type, disease_type).
+
+    The cube is built once per dataset version. Every query only touches the cells of the requested year,
+    so the cost of a query depends on the number of groups rather than on the number of approvals.
+    """
+
+    DIMENSIONS = ['year', 'month', 'Company', 'drug_type', 'disease_type']
+
+    def __init__(self, df: DataFrame):
+        """
+        Args:
+            df (DataFrame): Approvals with a parsed 'Date of Approval' column and a 'year' column.
+        """
+
+        dates = df['Date of Approval']
+        keys = df.assign(month=dates.dt.month)[self.DIMENSIONS].dropna(subset=['year', 'month'])
+        keys = keys.astype({'year': int, 'month': int})
+
+        self.counts = keys.groupby(self.DIMENSIONS, dropna=False, observed=True).size().reset_index(name='total')
+        self._by_year: Dict[int, DataFrame] = {
+            int(year): cells.reset_index(drop=True) for year, cells in self.counts.groupby('year')
+        }
+        self._empty = self.counts.iloc[0:0]
+
+        # Display labels prepared at ingest (see utils.ingest), by dimension and item
+        self._labels: Dict[str, Dict[str, Tuple[str, str]]] = {}
+        for col in self.DIMENSIONS[2:]:
+            if f'{col}_label' in df and f'{col}_short' in df:
+                items = df[[col, f'{col}_label', f'{col}_short']].dropna().drop_duplicates(subset=col)
+                self._labels[col] = {
+                    item: (label, short) for item, label, short in items.itertuples(index=False, name=None)
+                }
+
+    @property
+    def years(self) -> List[int]:
+        return sorted(self._by_year)
+
+    def labels(self, col: str, item: str) -> Tuple[str, str]:
+        """
+        Returns the full and short display labels of an item, or the item itself if it has no labels.
+        """
+
+        return self._labels.get(col, {}).get(item, (item, item))
+
+    def cells(self, year: Optional[int] = None) -> DataFrame:
+        """
+        Returns the non-empty cells of the cube for a year, or the whole cube if year is None.
+        """
+
+        if year is None:
+            return self.counts
+        return self._by_year.get(int(year), self._empty)
+
+    def total(self, year: Optional[int] = None) -> int:
+        """
+        Returns the number of approvals of a year.
+        """
+
+        return int(self.cells(year)['total'].sum())
+
+    def top(self, col: str, year: Optional[int] = None, n: Optional[int] = None) -> DataFrame:
+        """
+        Returns the items of a dimension sorted by decreasing number of approvals.
+
+        Args:
+            col (str): The dimension to rank ('Company', 'drug_type' or 'disease_type').
+            year (Optional[int]): The year to consider, or None for all years.
+            n (Optional[int]): Number of items to keep, or None to keep all of them.
+
+        Returns:
+            DataFrame: A dataframe with the item in `col` and its count in 'total'.
+        """
+
+        ranked = (
+            self.cells(year)
+            .groupby(col, observed=True)['total'].sum()
+            .reset_index()
+            .sort_values(by='total', ascending=False, kind='stable')
+        )
+        return ranked if n is None else ranked[:n]
+
+    def monthly(self, year: Optional[int] = None) -> DataFrame:
+        """
+        Returns the number of approvals per month, with months as timestamps in 'Date of Approval'.
+        """
+
+        per_month = self.cells(year).groupby(['year', 'month'])['total'].sum().reset_index()
+        per_month['Date of Approval'] = pd.to_datetime(per_month[['year', 'month']].assign(day=1))
+        return per_month[['Date of Approval', 'total']]
+
+    def item_per_company(
+            self,
+            item_type: str,
+            n_companies: int,
+            year: Optional[int] = None
+    ) -> Tuple[DataFrame, List[str]]:
+        """
+        Returns the approvals of the top N companies, split by drug or disease type.
+
+        Args:
+            item_type (str): The dimension used to split the approvals ('drug_type' or 'disease_type').
+            n_companies (int): Number of companies to keep.
+            year (Optional[int]): The year to consider, or None for all years.
+
+        Returns:
+            Tuple containing:
+                - A dataframe with 'Company', `item_type` and 'total' for the top companies.
+                - The company names sorted by decreasing number of approvals.
+        """
+
+        item_per_company = (
+            self.cells(year)
+            .groupby(['Company', item_type], observed=True)['total'].sum()
+            .reset_index()
+        )
+
+        # Companies ranked by total approvals, ties broken by name as in the original chart
+        total_approvals_company = (
+            item_per_company.groupby('Company', observed=True)['total'].sum().reset_index(name='total')
+        )
+        companies_sorted = total_approvals_company.sort_values(
+            by=['total', 'Company'], ascending=False)[:n_companies]['Company'].to_list()
+
+        return item_per_company[item_per_company['Company'].isin(companies_sorted)], companies_sorted
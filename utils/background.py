@@ -0,0 +1,116 @@
+import functools
+import logging
+from typing import Any, Callable, List, Optional
+
+import dash
+
+from config import CONFIG
+
+ProgressSetter = Optional[Callable[[tuple], None]]
+
+# Milliseconds between two requests of the browser for the progress or the result of a job
+POLL_INTERVAL_MS = 250
+
+
+def dataset_version() -> str:
+    """
+    Returns the version of the cached dataset, which keys the cached results of the background callbacks: they are
+    computed again for a new version only.
+    """
+    from utils.loading_data import get_snapshot
+
+    return get_snapshot('NEW_DRUG_APPROVALS_FILENAME', 'csv').version
+
+
+def _make_manager():
+    if not CONFIG.BACKGROUND_CALLBACKS_ENABLED:
+        return None
+
+    # The manager also needs psutil and multiprocess, installed with dash[diskcache]
+    try:
+        import diskcache
+        manager = dash.DiskcacheManager(
+            diskcache.Cache(CONFIG.BACKGROUND_CALLBACKS_DIR),
+            cache_by=[dataset_version],
+            expire=int(CONFIG.BACKGROUND_CALLBACKS_EXPIRE),
+        )
+    except ImportError:
+        logging.warning('[+] dash[diskcache] is not installed, heavy callbacks run in the request')
+        return None
+
+    logging.info(f'[+] Heavy callbacks run as background jobs, results in {CONFIG.BACKGROUND_CALLBACKS_DIR}')
+    return manager
+
+
+# Job manager of the background callbacks, None when they run in the request
+BACKGROUND_MANAGER = _make_manager()
+
+
+def report_progress(set_progress: ProgressSetter, done: int, total: int) -> None:
+    """
+    Reports the progress of a background callback, as a percentage. Does nothing when the callback runs in the
+    request.
+    """
+    if set_progress is not None:
+        set_progress((round(100 * done / total),))
+
+
+def heavy_callback(
+        *args: Any,
+        progress: Optional[List[dash.Output]] = None,
+        running: Optional[List[tuple]] = None,
+        cancel: Optional[List[dash.Input]] = None,
+        **kwargs: Any
+) -> Callable[[Callable], Callable]:
+    """
+    Registers a callback whose computation may exceed a request timeout, like dash.callback.
+
+    With CONFIG.BACKGROUND_CALLBACKS_ENABLED (and diskcache installed), the callback runs as a background job of
+    the disk-backed job manager: the request returns at once and the browser polls for the result, so a slow
+    computation never holds a gunicorn worker thread. The job reports its progress to the `progress` outputs,
+    sets the `running` properties while it runs, is cancelled when one of the `cancel` inputs changes (or when
+    the callback is triggered again), and its result is cached per dataset version and inputs for
+    CONFIG.BACKGROUND_CALLBACKS_EXPIRE seconds. Otherwise, the callback is registered as usual and these options
+    are ignored.
+
+    The decorated function receives the progress setter as its `set_progress` keyword argument (None when it
+    runs in the request, see report_progress) and is returned unchanged, so it can still be called directly.
+
+    Args:
+        *args: Outputs, inputs and states of the callback.
+        progress (Optional[List[dash.Output]]): Outputs receiving the progress of the job.
+        running (Optional[List[tuple]]): (Output, value while running, value once done) triples.
+        cancel (Optional[List[dash.Input]]): Inputs cancelling the job when they change.
+        **kwargs: Other arguments of dash.callback, e.g. prevent_initial_call.
+
+    Returns:
+        Callable[[Callable], Callable]: The decorator.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        if BACKGROUND_MANAGER is None:
+            dash.callback(*args, **kwargs)(func)
+            return func
+
+        @functools.wraps(func)
+        def job(*values: Any) -> Any:
+            if progress:
+                set_progress, *values = values
+            else:
+                set_progress = None
+            return func(*values, set_progress=set_progress)
+
+        dash.callback(
+            *args,
+            background=True,
+            manager=BACKGROUND_MANAGER,
+            interval=POLL_INTERVAL_MS,
+            progress=progress,
+            progress_default=[0] * len(progress) if progress else None,
+            running=running,
+            cancel=cancel,
+            **kwargs
+        )(job)
+        return func
+
+    return decorator
@@ -0,0 +1,117 @@
+import logging
+import os
+import sys
+from typing import List, Optional
+
+import pandas as pd
+
+from config import CONFIG
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - the CSV backend is used instead
+    pa = None
+    pq = None
+
+COLUMNAR_EXTENSION = '.parquet'
+
+
+def _drug_approvals_schema() -> 'pa.Schema':
+    return pa.schema([
+        ('drug_name', pa.string()),
+        ('drug_generic_name', pa.string()),
+        ('mode_administration', pa.string()),
+        ('description', pa.string()),
+        ('Date of Approval', pa.timestamp('ns')),
+        ('Company', pa.string()),
+        ('Treatment for', pa.string()),
+        ('drug_type', pa.string()),
+        ('disease_type', pa.string()),
+    ])
+
+
+# Explicit schema of the columnar file of each dataset. Columns absent from the schema (such as the
+# 'Unnamed: *' columns of the CSV) are not written.
+SCHEMAS = {
+    'NEW_DRUG_APPROVALS_FILENAME': _drug_approvals_schema,
+}
+
+
+def is_available() -> bool:
+    """
+    Returns whether the columnar backend can be used (pyarrow is installed).
+    """
+    return pa is not None
+
+
+def columnar_path(filepath: str) -> str:
+    """
+    Returns the path of the columnar file stored alongside a CSV file.
+    """
+    return f'{os.path.splitext(filepath)[0]}{COLUMNAR_EXTENSION}'
+
+
+def read_columnar(filepath: str, data_type: str) -> pd.DataFrame:
+    """
+    Reads the columns of a dataset schema from its columnar file. Dates are stored already parsed.
+
+    Args:
+        filepath (str): Path of the columnar file.
+        data_type (str): Key of the dataset in CONFIG.FILENAME_MAPPING.
+
+    Returns:
+        pd.DataFrame: The typed data.
+    """
+    columns: Optional[List[str]] = None
+    if data_type in SCHEMAS:
+        columns = SCHEMAS[data_type]().names
+    return pq.read_table(filepath, columns=columns).to_pandas()
+
+
+def convert_to_columnar(data_type: str) -> str:
+    """
+    Builds the columnar file of a dataset from its CSV file, using the explicit schema of the dataset.
+
+    The file is first written to a temporary path and then renamed, so readers never see a partial file. It
+    gets the modification time of the CSV file, which keeps it selected by the loader and keeps the last
+    update date of the dataset unchanged.
+
+    Args:
+        data_type (str): Key of the dataset in CONFIG.FILENAME_MAPPING.
+
+    Returns:
+        str: Path of the columnar file.
+
+    Raises:
+        RuntimeError: If pyarrow is not installed.
+    """
+
+    if not is_available():
+        raise RuntimeError('pyarrow is required to build columnar files.')
+
+    filepath = f'{CONFIG.DATA_DIR_NAME}/{CONFIG.FILENAME_MAPPING[data_type]}'
+    schema = SCHEMAS[data_type]()
+
+    csv_stat = os.stat(filepath)
+    df = pd.read_csv(filepath)
+    df = df.reindex(columns=schema.names)
+    for name in schema.names:
+        if pa.types.is_timestamp(schema.field(name).type):
+            df[name] = pd.to_datetime(df[name], errors='coerce')
+
+    table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+    target = columnar_path(filepath)
+    tmp_target = f'{target}.tmp'
+    pq.write_table(table, tmp_target)
+    os.utime(tmp_target, ns=(csv_stat.st_atime_ns, csv_stat.st_mtime_ns))
+    os.replace(tmp_target, target)
+
+    logging.info(f'[+] {target} written ({table.num_rows} rows)')
+    return target
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    for name in sys.argv[1:] or list(SCHEMAS):
+        convert_to_columnar(name)
@@ -0,0 +1,266 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from dash.exceptions import PreventUpdate
+from pandas import DataFrame
+
+from config import CONFIG
+from utils.ingest import DETAIL_COLUMNS
+from utils.loading_data import DatasetSnapshot, get_snapshot, get_snapshot_by_version
+
+# Columns holding dates, which lose their dtype when records go through JSON
+DATE_COLUMNS = ['Date of Approval']
+
+# Marker of the payloads encoded by encode_columnar
+COLUMNAR_ENCODING = 'columnar'
+
+NS_PER_DAY = 24 * 60 * 60 * 10 ** 9
+
+StorePayload = Union[Dict[str, Any], List[Dict[str, Any]]]
+
+
+def is_handle(payload: StorePayload) -> bool:
+    """
+    Tells whether a Store payload is a handle to a server-side snapshot (see make_store_payload).
+    """
+    return isinstance(payload, dict) and payload.get('encoding') != COLUMNAR_ENCODING
+
+
+def encode_columnar(df: DataFrame) -> Dict[str, Any]:
+    """
+    Encodes a DataFrame as a compact, JSON-serialisable dictionary of columns.
+
+    Column names are written once instead of once per row. Categorical columns are dictionary-encoded (their
+    categories, then one integer code per row, -1 for missing values) and dates are written as integers (days
+    since the epoch, or milliseconds when they have a time of day), as are floats holding whole numbers (such
+    as years), with the positions of their missing values. Codes, dates and numbers are kept as NumPy arrays,
+    which orjson serialises without a Python object per value (see utils.serialisation). Other columns are
+    plain lists, with None for missing values.
+
+    Args:
+        df (DataFrame): The data to encode.
+
+    Returns:
+        Dict[str, Any]: The payload, decoded by decode_columnar.
+    """
+
+    columns = []
+    for name, series in df.items():
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Filtered frames keep all the categories of the dataset, only those in use are sent
+            series = series.cat.remove_unused_categories()
+            columns.append({
+                'name': name,
+                'kind': 'category',
+                'categories': series.cat.categories.tolist(),
+                'codes': series.cat.codes.to_numpy(),
+            })
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            ns = series.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+            valid = series.notna().to_numpy()
+            unit, scale = ('D', NS_PER_DAY) if not (ns[valid] % NS_PER_DAY).any() else ('ms', 10 ** 6)
+            columns.append({
+                'name': name,
+                'kind': 'date',
+                'dtype': str(series.dtype),
+                'unit': unit,
+                'values': np.where(valid, ns // scale, 0),
+                'missing': np.flatnonzero(~valid),
+            })
+        elif pd.api.types.is_float_dtype(series) and not (series.dropna() % 1).any():
+            valid = series.notna().to_numpy()
+            columns.append({
+                'name': name,
+                'kind': 'integer',
+                'dtype': str(series.dtype),
+                'values': np.where(valid, series.to_numpy(), 0).astype(np.int64),
+                'missing': np.flatnonzero(~valid),
+            })
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            columns.append({'name': name, 'kind': 'values', 'dtype': str(series.dtype), 'values': series.to_numpy()})
+        else:
+            columns.append({
+                'name': name,
+                'kind': 'values',
+                'dtype': str(series.dtype),
+                'values': series.astype(object).where(series.notna(), None).tolist(),
+            })
+
+    return {'encoding': COLUMNAR_ENCODING, 'length': len(df), 'columns': columns}
+
+
+def _positions(values: Any, length: int) -> np.ndarray:
+    # Positions of the missing values of a column, which must designate rows of the payload
+    positions = np.asarray(values, dtype=np.int64)
+    if positions.size and (positions.min() < 0 or positions.max() >= length):
+        raise IndexError('missing value positions out of range')
+    return positions
+
+
+def decode_columnar(payload: Dict[str, Any]) -> DataFrame:
+    """
+    Decodes a payload built by encode_columnar, with categorical columns and dates restored.
+
+    Payloads come back from the browser, so their codes and positions are validated: an invalid payload is logged
+    and the callback is cancelled (PreventUpdate) rather than failing further down.
+    """
+
+    try:
+        length = int(payload['length'])
+        data = {}
+        for column in payload['columns']:
+            kind = column['kind']
+            if kind == 'category':
+                codes = np.asarray(column['codes'], dtype=np.int32)
+                values = pd.Categorical.from_codes(codes, column['categories'], validate=True)
+            elif kind == 'date':
+                dates = np.asarray(column['values'], dtype=np.int64).astype(f"datetime64[{column['unit']}]")
+                dates[_positions(column['missing'], length)] = np.datetime64('NaT')
+                values = pd.Series(dates).astype(column['dtype'])
+            elif kind == 'integer':
+                numbers = np.asarray(column['values'], dtype=np.float64)
+                numbers[_positions(column['missing'], length)] = np.nan
+                values = pd.Series(numbers).astype(column['dtype'])
+            else:
+                values = pd.Series(column['values'], dtype=column['dtype'])
+
+            if len(values) != length:
+                raise ValueError(f"column {column['name']!r} has {len(values)} values instead of {length}")
+            data[column['name']] = values
+
+        return DataFrame(data, index=pd.RangeIndex(length))
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        logging.warning(f'[+] Invalid columnar payload, update cancelled: {e}')
+        raise PreventUpdate
+
+
+def make_store_payload(snapshot: DatasetSnapshot, file_type: str = 'csv') -> StorePayload:
+    """
+    Builds the content of a dcc.Store for a dataset snapshot.
+
+    In 'handle' mode (CONFIG.DATA_STORE_MODE) the Store only holds a small handle identifying the snapshot,
+    which callbacks resolve against the server-side registry. In 'columnar' and 'records' modes the data is
+    sent, without the detail columns, which are served by get_record: either encoded by encode_columnar or as a
+    list of records.
+
+    Args:
+        snapshot (DatasetSnapshot): The snapshot to store.
+        file_type (str): Format of the underlying file, used to reload the dataset if the snapshot is gone.
+
+    Returns:
+        StorePayload: A handle dictionary, a columnar payload or a list of records.
+    """
+
+    if CONFIG.DATA_STORE_MODE == 'handle':
+        return {
+            'data_type': snapshot.data_type,
+            'file_type': file_type,
+            'version': snapshot.version,
+        }
+
+    df = snapshot.data.drop(columns=DETAIL_COLUMNS)
+    if CONFIG.DATA_STORE_MODE == COLUMNAR_ENCODING:
+        return encode_columnar(df)
+    return df.to_dict('records')
+
+
+def filter_store_payload(payload: StorePayload, year: int) -> StorePayload:
+    """
+    Restricts a Store payload to the approvals of a given year.
+
+    Args:
+        payload (StorePayload): Content of the 'drug-approvals-data' Store.
+        year (int): The year to keep.
+
+    Returns:
+        StorePayload: The handle extended with the year, or the filtered data in the encoding of the payload.
+    """
+
+    if is_handle(payload):
+        return {**payload, 'year': year}
+
+    df = resolve_store_payload(payload)
+    df = df[df['year'] == year]
+    if isinstance(payload, dict):
+        return encode_columnar(df)
+    return df.to_dict('records')
+
+
+def resolve_snapshot(handle: Dict[str, Any]) -> DatasetSnapshot:
+    """
+    Looks up the snapshot referenced by a handle in the registry.
+
+    If the referenced version is no longer alive in this process (e.g. another worker served the first request,
+    or the file was refreshed), the current snapshot of the dataset is used instead.
+
+    Args:
+        handle (Dict[str, Any]): A handle built by make_store_payload.
+
+    Returns:
+        DatasetSnapshot: The snapshot to read.
+    """
+
+    snapshot = get_snapshot_by_version(handle['version'])
+    if snapshot is None:
+        snapshot = get_snapshot(handle['data_type'], handle['file_type'])
+        if snapshot.version != handle['version']:
+            logging.info(f"[+] Version {handle['version']} not available, using {snapshot.version}")
+    return snapshot
+
+
+def resolve_store_payload(payload: StorePayload) -> DataFrame:
+    """
+    Turns the content of a Store back into a typed DataFrame.
+
+    Handles are looked up in the snapshot registry (see resolve_snapshot) and columnar payloads are decoded.
+
+    Args:
+        payload (StorePayload): A handle dictionary, a columnar payload or a list of records.
+
+    Returns:
+        DataFrame: The corresponding data, with dates parsed. It must be treated as read-only.
+    """
+
+    if is_handle(payload):
+        df = resolve_snapshot(payload).data
+        if 'year' in payload:
+            df = df[df['year'] == payload['year']]
+        return df
+
+    if isinstance(payload, dict):
+        return decode_columnar(payload)
+
+    if not payload:
+        # An empty list of records (a year without approvals) has no columns to rebuild, the empty frame keeps
+        # those of the dataset
+        return get_snapshot('NEW_DRUG_APPROVALS_FILENAME', 'csv').data.drop(columns=DETAIL_COLUMNS).iloc[0:0]
+
+    df = pd.DataFrame(payload)
+    for col in DATE_COLUMNS:
+        if col in df:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    return df
+
+
+def get_record(data_type: str, file_type: str, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+    """
+    Fetches a single record of the current snapshot through its detail index.
+
+    Args:
+        data_type (str): Key of the dataset in CONFIG.FILENAME_MAPPING.
+        file_type (str): Format of the file.
+        key (Tuple[str, str]): The (drug_name, approval_date) key of the record.
+
+    Returns:
+        Optional[Dict[str, Any]]: The record, with missing values as None, or None if the key is unknown.
+    """
+
+    snapshot = get_snapshot(data_type, file_type)
+    position = snapshot.derived['details'].get(key)
+    if position is None:
+        return None
+
+    record = snapshot.data.iloc[position]
+    return record.where(record.notna(), None).to_dict()
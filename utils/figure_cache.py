@@ -0,0 +1,138 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from plotly.graph_objs import Figure
+
+from config import CONFIG
+from utils.serialisation import loads
+from utils.shared_cache import SHARED_CACHE, SQLiteCache
+from utils.single_flight import SINGLE_FLIGHT
+from utils.tracing import span
+
+
+def _build_json(build: Callable[[], Figure]) -> str:
+    with span('figure build'):
+        figure = build()
+    with span('serialisation', part='figure'):
+        return figure.to_json()
+
+
+class FigureCache:
+    """
+    Bounded LRU cache of serialised Plotly figures.
+
+    Figures are stored as JSON strings, whose length bounds the memory held by the cache and which keep the
+    cached entries immutable. The least recently used entries are evicted once either bound is exceeded.
+
+    When a shared cache is given, it is used as a second tier: local misses are looked up there, and built
+    figures are written to it so that other workers can reuse them.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, shared: Optional[SQLiteCache] = None):
+        """
+        Args:
+            max_entries (int): Maximum number of cached figures.
+            max_bytes (int): Maximum total length of the cached JSON, in characters (one byte each, except for
+                the few non-ASCII characters of the labels).
+            shared (Optional[SQLiteCache]): Cache shared between workers, if any.
+        """
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[Hashable, str]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.shared = shared
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[str]:
+        with self._lock:
+            figure_json = self._entries.get(key)
+            if figure_json is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return figure_json
+
+    def set(self, key: Hashable, figure_json: str) -> None:
+        size = len(figure_json)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = figure_json
+            self._size += size
+
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def _load_or_build(self, key: tuple, build: Callable[[], Figure]) -> str:
+        with self._lock:
+            # Built by a computation which ended between the miss and this call
+            figure_json = self._entries.get(key)
+        if figure_json is not None:
+            return figure_json
+
+        shared_value = self.shared.get(repr(key)) if self.shared is not None else None
+        if shared_value is not None:
+            figure_json = shared_value.decode()
+        else:
+            figure_json = _build_json(build)
+            if self.shared is not None:
+                self.shared.set(repr(key), figure_json.encode(), version=key[1])
+        self.set(key, figure_json)
+        return figure_json
+
+    def get_or_build(self, key: Optional[tuple], build: Callable[[], Figure]) -> Dict[str, Any]:
+        """
+        Returns the cached figure for a key, building and caching it on a miss. Concurrent misses of the same key
+        wait for a single build (see utils.single_flight).
+
+        Args:
+            key (Optional[tuple]): Cache key (figure name, dataset version, *inputs), which must include every
+                input of the figure. None disables caching for this call (e.g. when the dataset version is unknown).
+            build (Callable[[], Figure]): Computes the figure, aggregation included.
+
+        Returns:
+            Dict[str, Any]: The figure as a dictionary, ready to be used as a dcc.Graph figure.
+        """
+
+        if key is None:
+            figure_json = _build_json(build)
+        else:
+            figure_json = self.get(key)
+            if figure_json is None:
+                figure_json = SINGLE_FLIGHT.do(('figure', key), lambda: self._load_or_build(key, build))
+
+        with span('serialisation', part='figure'):
+            return loads(figure_json)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the hit/miss counters and the current occupancy of the cache.
+        """
+
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._size,
+            }
+
+
+FIGURE_CACHE = FigureCache(
+    max_entries=int(CONFIG.FIGURE_CACHE_MAX_ENTRIES),
+    max_bytes=int(CONFIG.FIGURE_CACHE_MAX_BYTES),
+    shared=SHARED_CACHE,
+)
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+from utils.tracing import span
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+
+# Number of rows fetched per block by the infinite row model of the approvals grid
+GRID_BLOCK_SIZE = 50
+
+
+def sort_key(sort_model: Optional[List[Dict[str, str]]], columns: Iterable[str]) -> tuple:
+    """
+    Turns an AG Grid sort model into a hashable key, e.g. (('drug_name', 'asc'),).
+
+    The sort model comes from the client, so the items on columns which are not in `columns`, with another sort
+    than 'asc' or 'desc', or on a column already sorted by a previous item are left out.
+
+    Args:
+        sort_model (Optional[List[Dict[str, str]]]): The sortModel of a getRowsRequest.
+        columns (Iterable[str]): The columns of the grid.
+
+    Returns:
+        tuple: The key, read by sort_rows.
+    """
+
+    columns = set(columns)
+    key = {}
+    for item in sort_model or []:
+        if not isinstance(item, dict):
+            continue
+        col, direction = item.get('colId'), item.get('sort')
+        if col in columns and col not in key and direction in ('asc', 'desc'):
+            key[col] = direction
+    return tuple(key.items())
+
+
+def sort_rows(frame: DataFrame, key: tuple) -> DataFrame:
+    """
+    Sorts the rows of the grid as requested by a sort key. Rows keep their order (most recent first) when the
+    key is empty, and ties keep it too.
+
+    Args:
+        frame (DataFrame): The rows of the grid.
+        key (tuple): A key built by sort_key.
+
+    Returns:
+        DataFrame: The sorted rows.
+    """
+
+    if not key:
+        return frame
+
+    columns = [col for col, _ in key]
+    ascending = [direction == 'asc' for _, direction in key]
+    return frame.sort_values(by=columns, ascending=ascending, kind='stable')
+
+
+def get_rows_block(frame: DataFrame, request: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Answers a getRowsRequest of the infinite row model with the requested block of already sorted rows.
+
+    Args:
+        frame (DataFrame): The rows of the grid, sorted as requested by `request['sortModel']`.
+        request (Dict[str, Any]): The getRowsRequest of the grid, with 'startRow' and 'endRow'.
+
+    Returns:
+        Dict[str, Any]: The getRowsResponse, with the rows of the block and the total number of rows.
+    """
+
+    start_row = request.get('startRow', 0)
+    end_row = request.get('endRow', start_row + GRID_BLOCK_SIZE)
+    with span('serialisation', part='grid block'):
+        return {
+            'rowData': frame.iloc[start_row:end_row].to_dict('records'),
+            'rowCount': len(frame),
+        }
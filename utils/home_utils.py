@@ -1,22 +1,41 @@
-from typing import Optional, List
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from typing import TYPE_CHECKING, Any, Dict, Optional, List
 
 import dash_mantine_components as dmc
 from dash.development.base_component import Component
-import pandas as pd
-import plotly.express as px
+import plotly
 import plotly.graph_objs as go
+import plotly.io as pio
 from plotly.graph_objs import Figure
-from pandas import DataFrame
 
+import layout_constants
 from layout_constants import (
     WITHOUT_PADDING,
     BG_TRANSPARENT,
     HOVERLABEL_TEMPLATE,
 )
+from utils.lazy_imports import lazy_import
+from utils.serialisation import loads
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+
+# Only needed to build figures, which the callbacks do: importing them is left to the first callback
+pd = lazy_import('pandas')
+px = lazy_import('plotly.express')
 
 # Define constants
 MARGIN_BOTTOM = 7
 
+# Figures shown by the home page until its callbacks answer, built by `python -m utils.home_utils`
+PLACEHOLDER_FIGURES_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'layouts', 'placeholder_figures.json'
+)
+
 
 def plot_approvals_year(df: DataFrame) -> Figure:
     """
@@ -113,12 +132,12 @@ def plot_drug_type(df: DataFrame) -> Figure:
     return fig_approvals_drug_type
 
 
-def plot_stacked_item_company(df: pd.DataFrame, item_type: str, companies_sorted: list) -> Figure:
+def plot_stacked_item_company(df: DataFrame, item_type: str, companies_sorted: list) -> Figure:
     """
     Create a Plotly Express stacked bar chart from the filtered DataFrame.
 
     Args:
-    df (pd.DataFrame): Filtered DataFrame containing approval data for top companies.
+    df (DataFrame): Filtered DataFrame containing approval data for top companies.
     item_type (str): Category of approvals ('drug' or 'disease') used for coloring the bars.
     companies_sorted (list): List of company names sorted by the total approvals.
 
@@ -162,6 +181,80 @@ def plot_stacked_item_company(df: pd.DataFrame, item_type: str, companies_sorted
     return fig
 
 
+def build_placeholder_figures() -> Dict[str, Figure]:
+    """
+    Builds the empty figures shown by the home page before its first callbacks answer.
+
+    Returns:
+        Dict[str, Figure]: The figures, by id of their dcc.Graph.
+    """
+
+    return {
+        'yearly-approvals-fig': plot_approvals_year(pd.DataFrame(columns=['Date of Approval', 'total'])),
+        'drug-type-fig': plot_drug_type(df=pd.DataFrame(columns=['drug_type', 'total'])),
+        'company-stacked-fig': plot_stacked_item_company(
+            df=pd.DataFrame(columns=['total', 'Company', 'drug_type']),
+            item_type='drug_type',
+            companies_sorted=list()
+        ),
+    }
+
+
+def _placeholder_source_key() -> str:
+    """
+    Identifies the code the placeholder figures are built from: this module, the layout constants and plotly.
+    """
+    digest = hashlib.sha256(plotly.__version__.encode())
+    for path in (__file__, layout_constants.__file__):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+def write_placeholder_figures(filepath: str = PLACEHOLDER_FIGURES_PATH) -> str:
+    """
+    Builds the placeholder figures and saves them as JSON, with the key of the code they were built from.
+
+    Args:
+        filepath (str): Path of the JSON file.
+
+    Returns:
+        str: Path of the JSON file.
+    """
+
+    figures = {name: fig.to_plotly_json() for name, fig in build_placeholder_figures().items()}
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write(pio.json.to_json_plotly({'source_key': _placeholder_source_key(), 'figures': figures}))
+
+    logging.info(f'[+] {filepath} written')
+    return filepath
+
+
+def load_placeholder_figures(filepath: str = PLACEHOLDER_FIGURES_PATH) -> Dict[str, Dict[str, Any]]:
+    """
+    Loads the placeholder figures of the home page, which is much faster than building them on startup (plotly
+    express and pandas are not imported). They are built instead when the file is missing or was built from
+    another version of the plotting code.
+
+    Args:
+        filepath (str): Path of the JSON file written by write_placeholder_figures.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: The figures as dictionaries, by id of their dcc.Graph.
+    """
+
+    try:
+        with open(filepath, 'rb') as f:
+            content = loads(f.read())
+        if content['source_key'] == _placeholder_source_key():
+            return content['figures']
+    except (OSError, ValueError, KeyError):
+        pass
+
+    logging.warning(f'[+] {filepath} is missing or outdated, run `python -m utils.home_utils` to rebuild it')
+    return {name: loads(fig.to_json()) for name, fig in build_placeholder_figures().items()}
+
+
 def add_loading_overlay(elements: Optional[List[Component]] = None, id: str = '', **kwargs) -> dmc.LoadingOverlay:
     """
     Wraps provided elements with a loading overlay, which shows a loading animation when active.
@@ -186,3 +279,8 @@ def add_loading_overlay(elements: Optional[List[Component]] = None, id: str = ''
         style=kwargs.get('extra_styles', {}),
         id=id
     )
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    write_placeholder_figures()
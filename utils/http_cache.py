@@ -0,0 +1,114 @@
+import hashlib
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional
+
+import dash
+import flask
+from plotly.io.json import to_json_plotly
+from werkzeug.datastructures import ETags
+
+from config import CONFIG
+
+if TYPE_CHECKING:
+    from utils.loading_data import DatasetSnapshot
+
+
+def cacheable_paths(app) -> set:
+    """
+    Returns the paths of the GET responses of a Dash app which only change with a new deployment: the pages
+    (whatever their query string), the layout and the callback graph.
+    """
+    prefix = app.config.routes_pathname_prefix
+    paths = {app.get_relative_path(page['path']) for page in dash.page_registry.values()}
+    return paths | {f'{prefix}_dash-layout', f'{prefix}_dash-dependencies'}
+
+
+def view_etag(snapshot: 'DatasetSnapshot', state: dict) -> str:
+    """
+    Returns the strong ETag of a view of the dashboard: a hash of the dataset version and of its modification
+    date (both displayed), of the view state (see pages.home.parse_view_state), with the current year when no
+    year is selected, and of the settings which change the rendered values.
+    """
+    if state.get('year') is None:
+        state = {**state, 'year': datetime.now().year}
+    key = repr((
+        snapshot.version, snapshot.last_update, sorted(state.items()), CONFIG.DATA_STORE_MODE, CONFIG.GRID_ROW_MODEL
+    ))
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+def matching_etag(etag: str, if_none_match: ETags) -> Optional[str]:
+    """
+    Returns the entity tag of an If-None-Match header which designates `etag`, None if there is none. The
+    compression of utils.serialisation suffixes the ETag of a compressed response with its algorithm (e.g.
+    `<etag>:br`), which is what browsers send back.
+    """
+    for tag in if_none_match.as_set():
+        if tag.split(':', 1)[0] == etag:
+            return tag
+    return None
+
+
+def init_http_cache(app) -> None:
+    """
+    Lets browsers and reverse proxies revalidate the pages and the views of a Dash app instead of downloading
+    them again. Does nothing when HTTP caching is disabled (CONFIG.HTTP_CACHE_ENABLED).
+
+    The GET responses of the pages, of the layout and of the callback graph get a strong ETag (a hash of the bytes
+    sent, so each compression gets its own) and a Cache-Control header allowing them to be reused for
+    CONFIG.HTTP_CACHE_MAX_AGE seconds, then revalidated. A request whose If-None-Match holds the current ETag is
+    answered with an empty 304. Responses setting a cookie (see utils.tracing) are only cached by the browser.
+
+    The data of the dashboard is served by callbacks, whose POST requests browsers and proxies do not reuse. The
+    same views are also served on CONFIG.VIEW_PATH, as GET requests taking the query string of the page (e.g.
+    `?year=2023&item_type=drug_type&n_companies=10`). Their ETag is computed from the dataset version and the view
+    state before anything is rendered (see view_etag), so a revalidation is answered without computing the view,
+    whatever the compression of the response it revalidates.
+
+    Must be registered before utils.tracing.init_tracing and utils.serialisation.init_serialisation, so that the
+    ETag is computed on the compressed response and the trace cookie is seen.
+
+    Args:
+        app (dash.Dash): The Dash app.
+    """
+
+    if not CONFIG.HTTP_CACHE_ENABLED:
+        return
+
+    server = app.server
+    paths = cacheable_paths(app)
+    max_age = int(CONFIG.HTTP_CACHE_MAX_AGE)
+
+    @server.route(CONFIG.VIEW_PATH)
+    def dashboard_view():
+        from pages import home
+        from utils.loading_data import get_snapshot
+
+        state = home.parse_view_state(flask.request.args)
+        snapshot = get_snapshot('NEW_DRUG_APPROVALS_FILENAME', 'csv')
+        etag = view_etag(snapshot, state)
+
+        cache_control = f'public, max-age={max_age}, must-revalidate'
+        matched = matching_etag(etag, flask.request.if_none_match)
+        if matched is not None:
+            return flask.Response(status=304, headers={'ETag': f'"{matched}"', 'Cache-Control': cache_control})
+
+        view = home.render_view(snapshot, **state)
+        return flask.Response(
+            to_json_plotly(view),
+            mimetype='application/json',
+            headers={'ETag': f'"{etag}"', 'Cache-Control': cache_control}
+        )
+
+    @server.after_request
+    def add_cache_validators(response: flask.Response) -> flask.Response:
+        request = flask.request
+        if request.method not in ('GET', 'HEAD') or request.path not in paths:
+            return response
+        if response.status_code != 200 or response.direct_passthrough or response.is_streamed:
+            return response
+
+        scope = 'private' if 'Set-Cookie' in response.headers else 'public'
+        response.headers['Cache-Control'] = f'{scope}, max-age={max_age}, must-revalidate'
+        response.add_etag()
+        return response.make_conditional(request)
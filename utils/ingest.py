@@ -0,0 +1,101 @@
+from typing import Dict, Tuple
+
+import pandas as pd
+from pandas import DataFrame
+
+from layout_constants import SUFFIXES_TO_DELETE
+
+# Columns with few distinct values, stored as categoricals
+CATEGORICAL_COLUMNS = ['Company', 'drug_type', 'disease_type', 'mode_administration']
+
+# Columns displayed in the KPI panel, which get precomputed display labels
+LABELLED_COLUMNS = ['Company', 'disease_type', 'drug_type']
+
+DISPLAY_DATE_FORMAT = '%Y-%m-%d'
+
+# Columns only displayed in the drug detail modal, which never travel with the Stores or the grid
+DETAIL_COLUMNS = ['drug_generic_name', 'mode_administration', 'description', 'Treatment for']
+
+
+def make_display_labels(name: str, col: str) -> Tuple[str, str]:
+    """
+    Computes the labels used to display an item in the KPI panel.
+
+    Disease types lose their generic suffix (e.g. ' Diseases'), and names of several words are shortened so that
+    they fit in the panel, the full name being shown in a tooltip.
+
+    Args:
+        name (str): The item, e.g. a company name.
+        col (str): The column of the item ('Company', 'disease_type' or 'drug_type').
+
+    Returns:
+        Tuple[str, str]: The full display label and the short label. Both are equal when no tooltip is needed.
+    """
+
+    # Clean up disease_type names by removing specified suffixes
+    if col == 'disease_type':
+        for suffix in SUFFIXES_TO_DELETE:
+            if suffix in name:
+                name = name.replace(suffix, '')
+                break
+
+    if 'Reproductive' in name:
+        return name, 'Reprod. Sys.'
+
+    split_name = name.split()
+    if len(split_name) > 1:
+        return name, f'{split_name[0]} {split_name[1][:5 if col != "Company" else 4]}.'
+
+    return name, name
+
+
+def prepare_drug_approvals(df: DataFrame) -> DataFrame:
+    """
+    Normalises the drug approvals dataset once, when a new version is loaded.
+
+    The callbacks only read the columns prepared here:
+        - the 'Unnamed: *' columns left by the scraper are dropped, then exact duplicates are removed;
+        - 'Date of Approval' is parsed, 'year' is derived from it and 'approval_date' holds the displayed date;
+        - rows are sorted by decreasing approval date;
+        - low-cardinality columns become categoricals;
+        - '<col>_label' and '<col>_short' hold the KPI labels of the columns of LABELLED_COLUMNS.
+
+    Args:
+        df (DataFrame): The raw dataset, read from CSV or Parquet.
+
+    Returns:
+        DataFrame: The prepared dataset.
+    """
+
+    df = df.loc[:, ~df.columns.str.startswith('Unnamed')].drop_duplicates()
+
+    df['Date of Approval'] = pd.to_datetime(df['Date of Approval'], errors='coerce')
+    df = df.sort_values(by='Date of Approval', ascending=False, kind='stable').reset_index(drop=True)
+    df['year'] = df['Date of Approval'].dt.year
+    df['approval_date'] = df['Date of Approval'].dt.strftime(DISPLAY_DATE_FORMAT)
+
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype('category')
+
+    # Labels are computed once per category rather than once per row
+    for col in LABELLED_COLUMNS:
+        labels = {name: make_display_labels(name, col) for name in df[col].cat.categories}
+        df[f'{col}_label'] = df[col].map({name: label for name, (label, _) in labels.items()}).astype('category')
+        df[f'{col}_short'] = df[col].map({name: short for name, (_, short) in labels.items()}).astype('category')
+
+    return df
+
+
+def build_detail_index(df: DataFrame) -> Dict[Tuple[str, str], int]:
+    """
+    Indexes the prepared dataset by (drug_name, approval_date), the key sent by the grid when a row is clicked.
+
+    Args:
+        df (DataFrame): The prepared dataset.
+
+    Returns:
+        Dict[Tuple[str, str], int]: Position of the row of each key. The most recent row wins if a key appears twice.
+    """
+
+    keys = zip(df['drug_name'], df['approval_date'])
+    return {key: position for position, key in reversed(list(enumerate(keys)))}
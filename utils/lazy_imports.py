@@ -0,0 +1,43 @@
+import importlib
+import threading
+from types import ModuleType
+from typing import Any, Optional
+
+
+class LazyModule:
+    """
+    Stands for a module which is only imported when one of its attributes is first read, e.g. the pandas-based
+    data layer, which the first callback needs but serving the page does not.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        with self._lock:
+            if self._module is None:
+                self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self._module or self._load(), attribute)
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f'<lazy module {self._name!r} ({state})>'
+
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    Returns a proxy of a module which imports it on first use. Names must be read through the proxy
+    (`module.name`): `from module import name` would import it right away.
+
+    Args:
+        name (str): Absolute name of the module, e.g. 'plotly.express'.
+
+    Returns:
+        LazyModule: The proxy.
+    """
+    return LazyModule(name)
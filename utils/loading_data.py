@@ -1,33 +1,299 @@
+import hashlib
+import os
+import threading
+import time
+import weakref
 import pandas as pd
 import json
 import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from config import CONFIG, LocalConfig
+from utils import columnar
+from utils.aggregations import ApprovalsCube
+from utils.ingest import build_detail_index, prepare_drug_approvals
+from utils.metrics import timed_phase
+from utils.tracing import span
 
+# Number of hexadecimal characters of the content hash kept as the dataset version
+VERSION_LENGTH = 12
 
-def load_data(data_type: str, file_type: str):
+
+@dataclass(frozen=True)
+class DatasetSnapshot:
+    """
+    Immutable view of a loaded dataset, as held by the process-wide cache.
+
+    Attributes:
+        data_type (str): Key of the dataset in CONFIG.FILENAME_MAPPING.
+        data (Any): The parsed and typed data (a DataFrame for csv files, a dict for json files).
+        version (str): Short content hash identifying this version of the file.
+        last_update (str): Human-readable modification date of the underlying file.
+        signature (Tuple[str, int, int]): (path, mtime in ns, size in bytes) of the file when it was read.
+        derived (Dict[str, Any]): Structures precomputed from the data when the version was loaded
+            (see DERIVED_BUILDERS), e.g. the aggregation cube under 'cube'.
+    """
+    data_type: str
+    data: Any
+    version: str
+    last_update: str
+    signature: Tuple[str, int, int]
+    derived: Dict[str, Any] = field(default_factory=dict, compare=False, repr=False)
+
+
+# Ingest steps (typing, cleanup, display columns) applied once per dataset version, right after parsing
+DATA_PREPARERS: Dict[str, Callable[[Any], Any]] = {
+    'NEW_DRUG_APPROVALS_FILENAME': prepare_drug_approvals,
+}
+
+# Structures built once per dataset version, right after the typing step
+DERIVED_BUILDERS: Dict[str, Dict[str, Callable[[Any], Any]]] = {
+    'NEW_DRUG_APPROVALS_FILENAME': {'cube': ApprovalsCube, 'details': build_detail_index},
+}
+
+# Functions called with (old snapshot, new snapshot) each time a new version of a dataset replaces the cached one
+SNAPSHOT_LISTENERS: List[Callable[[DatasetSnapshot, DatasetSnapshot], None]] = []
+
+_CACHE: Dict[str, DatasetSnapshot] = {}
+
+# Serialises the (re)builds of the snapshots. Readers never take it: swapping a snapshot is a single assignment
+_BUILD_LOCK = threading.Lock()
+
+# Every snapshot still referenced somewhere (cache or in-flight callback), by version
+_SNAPSHOTS: 'weakref.WeakValueDictionary[str, DatasetSnapshot]' = weakref.WeakValueDictionary()
+
+
+def _file_signature(filepath: str) -> Tuple[str, int, int]:
+    stat = os.stat(filepath)
+    return filepath, stat.st_mtime_ns, stat.st_size
+
+
+def _select_source(filepath: str, file_type: str) -> Tuple[str, str]:
+    """
+    Picks the file to read for a dataset. A CSV file is read from its columnar equivalent when that file
+    exists, is at least as recent as the CSV and pyarrow is installed.
+    """
+    if file_type == 'parquet':
+        return columnar.columnar_path(filepath), 'parquet'
+
+    if file_type == 'csv' and columnar.is_available():
+        columnar_filepath = columnar.columnar_path(filepath)
+        try:
+            if os.stat(columnar_filepath).st_mtime_ns >= os.stat(filepath).st_mtime_ns:
+                return columnar_filepath, 'parquet'
+        except FileNotFoundError:
+            pass
+
+    return filepath, file_type
+
+
+def _content_version(filepath: str) -> str:
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:VERSION_LENGTH]
+
+
+def _read_file(filepath: str, file_type: str, data_type: str) -> Any:
+    if file_type == 'json':
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    if file_type == 'parquet':
+        return columnar.read_columnar(filepath, data_type)
+    return pd.read_csv(filepath)
+
+
+def _build_snapshot(data_type: str, file_type: str, cached: Optional[DatasetSnapshot]) -> DatasetSnapshot:
+    """
+    Builds the snapshot of the current file of a dataset: parsing, typing and derived structures. Returns the
+    cached snapshot itself when the file has not changed.
+    """
 
     filename = CONFIG.FILENAME_MAPPING[data_type]
+    filepath, file_type = _select_source(f'{CONFIG.DATA_DIR_NAME}/{filename}', file_type)
+    signature = _file_signature(filepath)
+    if cached is not None and cached.signature == signature:
+        return cached
 
-    # Loading data from local environment
-    if isinstance(CONFIG, LocalConfig):
+    with timed_phase(data_type, 'read'), span('read'):
+        version = _content_version(filepath)
+    last_update = datetime.fromtimestamp(signature[1] / 1e9).strftime('%b %d, %Y')
+    if cached is not None and cached.version == version:
+        return DatasetSnapshot(data_type, cached.data, version, last_update, signature, cached.derived)
+
+    logging.info(f'[LOCAL] -> Trying to load data for: {filename} from {filepath}')
+    with timed_phase(data_type, 'parse'), span('parse', file_type=file_type):
+        data = _read_file(filepath, file_type, data_type)
+    with timed_phase(data_type, 'transform'):
+        preparer = DATA_PREPARERS.get(data_type)
+        if preparer is not None:
+            with span('dataframe'):
+                data = preparer(data)
+        with span('aggregation'):
+            derived = {name: build(data) for name, build in DERIVED_BUILDERS.get(data_type, {}).items()}
+    logging.info(f'[+] {filename} successfully loaded! (version {version}, {file_type})')
+    return DatasetSnapshot(data_type, data, version, last_update, signature, derived)
+
+
+def refresh_snapshot(data_type: str, file_type: str) -> DatasetSnapshot:
+    """
+    Re-reads the file of a dataset when it has changed and swaps the new snapshot into the cache.
+
+    The file is stat'ed. When its mtime or size differs from the cached snapshot, its content hash is recomputed
+    and the file is parsed again only if the hash differs too (a touched but identical file keeps its snapshot).
+    The new snapshot is fully built before it replaces the cached one, in a single assignment: readers see
+    either the old or the new snapshot, never a partial one. Callbacks holding the old snapshot keep using it
+    until they return, after which it is freed (the registry of versions only holds weak references). Builds
+    are serialised, so that concurrent refreshes parse a new file once. The SNAPSHOT_LISTENERS are called after
+    each swap.
+
+    Args:
+        data_type (str): Key of the dataset in CONFIG.FILENAME_MAPPING.
+        file_type (str): Format of the file ('csv', 'parquet' or 'json'). CSV datasets are read from their
+            columnar file instead when it is up to date (see utils.columnar).
+
+    Returns:
+        DatasetSnapshot: The current snapshot of the dataset.
 
-        filepath = f'{CONFIG.DATA_DIR_NAME}/{filename}'
-        logging.info(f'[LOCAL] -> Trying to load data for: {filename}')
+    Raises:
+        RuntimeError: If the file cannot be loaded and no snapshot of the dataset is cached.
+    """
 
+    filename = CONFIG.FILENAME_MAPPING[data_type]
+
+    with _BUILD_LOCK:
+        cached: Optional[DatasetSnapshot] = _CACHE.get(data_type)
         try:
-            if file_type == 'json':
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-            else:
-                data = pd.read_csv(filepath)
-            last_update = '[LOCAL]'
+            snapshot = _build_snapshot(data_type, file_type, cached)
         except Exception as e:
-            logging.warning(f'[+] Error loading file from {filepath}: {e}')
-        else:
-            logging.info(f'[+] {filename} successfully loaded!')
-            return data, last_update
+            logging.warning(f'[+] Error loading file for {filename}: {e}')
+            if cached is not None:
+                logging.warning(f'[+] Serving cached version {cached.version} of {filename}')
+                return cached
+            raise RuntimeError(f"Unable to load data for: {filename}") from e
+
+        if snapshot is not cached:
+            _SNAPSHOTS[snapshot.version] = snapshot
+            _CACHE[data_type] = snapshot
+            if cached is not None and cached.version != snapshot.version:
+                logging.info(f'[+] {filename} swapped from version {cached.version} to {snapshot.version}')
+                for listener in SNAPSHOT_LISTENERS:
+                    try:
+                        listener(cached, snapshot)
+                    except Exception as e:
+                        logging.warning(f'[+] Snapshot listener {listener.__name__} failed: {e}')
+        return snapshot
+
+
+def get_snapshot(data_type: str, file_type: str) -> DatasetSnapshot:
+    """
+    Returns the current snapshot of a dataset, shared by all threads of the process.
+
+    When the dataset watcher is enabled (CONFIG.DATA_WATCH_ENABLED), the cached snapshot is returned as is and
+    new files are picked up by the watcher thread, off the request path (see DatasetWatcher). Otherwise, the
+    file is checked on every call (see refresh_snapshot). The first load of a dataset always happens in the
+    calling thread.
+
+    Args:
+        data_type (str): Key of the dataset in CONFIG.FILENAME_MAPPING.
+        file_type (str): Format of the file ('csv', 'parquet' or 'json'). CSV datasets are read from their
+            columnar file instead when it is up to date (see utils.columnar).
+
+    Returns:
+        DatasetSnapshot: The current snapshot of the dataset.
+
+    Raises:
+        RuntimeError: If the CONFIG is not supported or the file cannot be loaded.
+    """
+
+    # Loading data from local environment
+    if isinstance(CONFIG, LocalConfig):
+
+        with span('data load', data_type=data_type):
+            cached: Optional[DatasetSnapshot] = _CACHE.get(data_type)
+            if cached is None or not CONFIG.DATA_WATCH_ENABLED:
+                cached = refresh_snapshot(data_type, file_type)
+            if CONFIG.DATA_WATCH_ENABLED:
+                WATCHER.watch(data_type, file_type)
+            return cached
 
     raise RuntimeError(
         f"Invalid CONFIG detected. CONFIG must be an instance of either LocalConfig or AWSConfig. "
         f"Current CONFIG: {type(CONFIG).__name__}"
     )
+
+
+class DatasetWatcher:
+    """
+    Background thread refreshing the watched datasets every `interval` seconds (see refresh_snapshot), so that a
+    new file, e.g. written by the daily scraper, is parsed and swapped in without blocking any request.
+
+    The thread is started by the first dataset watched in each process, which also covers the gunicorn workers
+    forked from a preloaded app (threads do not survive a fork).
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._datasets: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def watch(self, data_type: str, file_type: str) -> None:
+        if self._datasets.get(data_type) == file_type and self._pid == os.getpid():
+            return
+        with self._lock:
+            self._datasets[data_type] = file_type
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='dataset-watcher', daemon=True)
+                self._thread.start()
+                logging.info(f'[+] Watching the datasets for new files every {self.interval:g} s')
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            for data_type, file_type in list(self._datasets.items()):
+                try:
+                    refresh_snapshot(data_type, file_type)
+                except Exception as e:
+                    logging.warning(f'[+] Dataset watcher could not refresh {data_type}: {e}')
+
+
+WATCHER = DatasetWatcher(float(CONFIG.DATA_WATCH_INTERVAL))
+
+
+def get_snapshot_by_version(version: str) -> Optional[DatasetSnapshot]:
+    """
+    Looks up a snapshot in the server-side registry.
+
+    Args:
+        version (str): Version of the snapshot, as returned in DatasetSnapshot.version.
+
+    Returns:
+        Optional[DatasetSnapshot]: The snapshot, or None if no snapshot of that version is alive in this process.
+    """
+    return _SNAPSHOTS.get(version)
+
+
+def load_data(data_type: str, file_type: str):
+    """
+    Loads a dataset through the process-wide cache.
+
+    Args:
+        data_type (str): Key of the dataset in CONFIG.FILENAME_MAPPING.
+        file_type (str): Format of the file ('csv', 'parquet' or 'json').
+
+    Returns:
+        Tuple containing:
+            - The typed data. DataFrames are returned as shallow copies so that adding or replacing columns
+              never alters the cached snapshot.
+            - The last update date of the underlying file.
+    """
+    snapshot = get_snapshot(data_type, file_type)
+    data = snapshot.data
+    if isinstance(data, pd.DataFrame):
+        data = data.copy(deep=False)
+    return data, snapshot.last_update
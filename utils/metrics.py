@@ -0,0 +1,223 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import flask
+
+from config import CONFIG
+
+# Upper bounds of the histogram buckets, in seconds and in bytes
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Label of the requests whose outputs are not those of a registered callback
+UNKNOWN_CALLBACK = 'unknown'
+
+HELP = {
+    'dash_callback_requests_total': ('counter', 'Number of callback requests.'),
+    'dash_callback_errors_total': ('counter', 'Number of callback requests answered with a server error.'),
+    'dash_callback_duration_seconds': ('histogram', 'Time spent answering a callback request.'),
+    'dash_callback_request_bytes': ('histogram', 'Size of the callback request bodies.'),
+    'dash_callback_response_bytes': ('histogram', 'Size of the callback response bodies.'),
+    'load_data_duration_seconds': ('histogram', 'Time spent loading a dataset, by phase (read, parse, transform).'),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """
+    Prometheus histogram: counts of observations per bucket, with their sum.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+def _escape_label(value: str) -> str:
+    # Escapes a label value as required by the Prometheus text format
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Labels, extra: str = '') -> str:
+    items = [f'{name}="{_escape_label(value)}"' for name, value in labels]
+    if extra:
+        items.append(extra)
+    return '{' + ','.join(items) + '}' if items else ''
+
+
+class Metrics:
+    """
+    Counters and histograms of the process, rendered in the Prometheus text format.
+
+    Recording an observation is a dictionary lookup and an increment under a lock. Each gunicorn worker keeps
+    its own metrics, so Prometheus should scrape the workers through a per-worker target or sum them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._collectors: List[Tuple[str, str, Callable[[], Dict[str, float]]]] = []
+
+    def inc(self, name: str, labels: Labels, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name, labels] = self._counters.get((name, labels), 0) + value
+
+    def observe(self, name: str, labels: Labels, value: float, buckets: Tuple[float, ...]) -> None:
+        with self._lock:
+            histogram = self._histograms.get((name, labels))
+            if histogram is None:
+                histogram = self._histograms[name, labels] = Histogram(buckets)
+            histogram.observe(value)
+
+    def add_collector(self, prefix: str, help_text: str, collect: Callable[[], Dict[str, float]]) -> None:
+        """
+        Registers a function called at every scrape, whose {statistic: value} results are exposed as the gauges
+        `<prefix>_<statistic>`, e.g. the stats() of a cache.
+        """
+        self._collectors.append((prefix, help_text, collect))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        declared = set()
+
+        def declare(name: str, metric_type: str, help_text: str) -> None:
+            if name not in declared:
+                declared.add(name)
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {metric_type}')
+
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                declare(name, *HELP[name])
+                lines.append(f'{name}{_format_labels(labels)} {value}')
+
+            for (name, labels), histogram in sorted(self._histograms.items(), key=lambda item: item[0]):
+                declare(name, *HELP[name])
+                cumulative = 0
+                for bound, count in zip((*histogram.buckets, '+Inf'), histogram.counts):
+                    cumulative += count
+                    bucket_labels = _format_labels(labels, f'le="{bound}"')
+                    lines.append(f'{name}_bucket{bucket_labels} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {histogram.sum}')
+                lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+
+        for prefix, help_text, collect in self._collectors:
+            for statistic, value in collect().items():
+                name = f'{prefix}_{statistic}'
+                declare(name, 'gauge', f'{help_text} ({statistic}).')
+                lines.append(f'{name} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = Metrics()
+
+_CALLBACK_NAMES: Dict[str, str] = {}
+
+
+def callback_path(app) -> str:
+    """
+    Returns the path of the endpoint which answers the callback requests of a Dash app.
+    """
+    return f'{app.config.routes_pathname_prefix}_dash-update-component'
+
+
+def callback_name(app, output: str) -> str:
+    """
+    Returns the name of the function of the callback identified by its outputs (the 'output' of a callback
+    request), or the outputs themselves for clientside callbacks.
+
+    The outputs are sent by the client, so those which are not registered in the app are all named
+    UNKNOWN_CALLBACK, and are not cached: the names, and the metric series labelled with them, stay bounded by the
+    callbacks of the app.
+    """
+    if not isinstance(output, str):
+        return UNKNOWN_CALLBACK
+
+    name = _CALLBACK_NAMES.get(output)
+    if name is None:
+        if output not in app.callback_map:
+            return UNKNOWN_CALLBACK
+        function = app.callback_map[output].get('callback')
+        name = _CALLBACK_NAMES[output] = getattr(function, '__name__', output)
+    return name
+
+
+@contextmanager
+def timed_phase(data_type: str, phase: str) -> Iterator[None]:
+    """
+    Records the duration of a phase of the loading of a dataset, when metrics are enabled.
+    """
+
+    if not CONFIG.METRICS_ENABLED:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        METRICS.observe(
+            'load_data_duration_seconds',
+            (('data_type', data_type), ('phase', phase)),
+            time.perf_counter() - start,
+            LATENCY_BUCKETS,
+        )
+
+
+def init_metrics(app, collectors: Optional[List[Tuple[str, str, Callable[[], Dict[str, float]]]]] = None) -> None:
+    """
+    Instruments the callback endpoint of a Dash app and serves the metrics on CONFIG.METRICS_PATH. Does nothing
+    when metrics are disabled (CONFIG.METRICS_ENABLED).
+
+    Args:
+        app (dash.Dash): The Dash app.
+        collectors (Optional[List[Tuple[str, str, Callable[[], Dict[str, float]]]]]): (prefix, help text,
+            function) of the statistics to expose as gauges at every scrape (see Metrics.add_collector).
+    """
+
+    if not CONFIG.METRICS_ENABLED:
+        return
+
+    server = app.server
+
+    for prefix, help_text, collect in collectors or []:
+        METRICS.add_collector(prefix, help_text, collect)
+
+    @server.before_request
+    def start_timer():
+        if flask.request.path == callback_path(app):
+            flask.g.metrics_start = time.perf_counter()
+
+    @server.after_request
+    def record_callback(response: flask.Response) -> flask.Response:
+        start = flask.g.pop('metrics_start', None)
+        if start is None:
+            return response
+
+        body = flask.request.get_json(silent=True) or {}
+        labels = (('callback', callback_name(app, body.get('output', ''))),)
+
+        METRICS.inc('dash_callback_requests_total', labels)
+        if response.status_code >= 500:
+            METRICS.inc('dash_callback_errors_total', labels)
+        METRICS.observe('dash_callback_duration_seconds', labels, time.perf_counter() - start, LATENCY_BUCKETS)
+        METRICS.observe('dash_callback_request_bytes', labels, flask.request.content_length or 0, SIZE_BUCKETS)
+        METRICS.observe(
+            'dash_callback_response_bytes', labels, response.calculate_content_length() or 0, SIZE_BUCKETS
+        )
+        return response
+
+    @server.route(CONFIG.METRICS_PATH)
+    def metrics():
+        return flask.Response(METRICS.render(), mimetype='text/plain; version=0.0.4')
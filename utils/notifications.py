@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Set
+
+import flask
+
+from config import CONFIG
+
+if TYPE_CHECKING:
+    from utils.loading_data import DatasetSnapshot
+
+# Columns of the added rows sent with a new version
+NOTIFIED_COLUMNS = ['approval_date', 'drug_name', 'Company', 'drug_type', 'disease_type', 'year']
+
+# Maximum number of added rows sent with a new version, the clients read the others from the new snapshot
+MAX_NOTIFIED_ROWS = 500
+
+# Events waiting to be sent to a client, older events of a slow client are dropped first
+MAX_QUEUED_EVENTS = 16
+
+# Seconds between two keep-alive comments of an idle stream, and lifetime of a stream before the browser
+# reconnects (which frees the worker thread of clients that left without closing the connection)
+HEARTBEAT_INTERVAL = 15
+STREAM_LIFETIME = 300
+
+
+class EventBroker:
+    """
+    Fans the dataset events of the process out to the connected clients, one bounded queue per client.
+    """
+
+    def __init__(self, max_queued: int):
+        self.max_queued = max_queued
+        self._subscribers: Set[queue.Queue] = set()
+        self._lock = threading.Lock()
+        self._published = 0
+        self._last: Dict[str, Dict[str, Any]] = {}
+
+    def subscribe(self) -> queue.Queue:
+        subscriber: queue.Queue = queue.Queue(self.max_queued)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue) -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        message = json.dumps(event)
+        with self._lock:
+            self._published += 1
+            self._last[event['data_type']] = event
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            while True:
+                try:
+                    subscriber.put_nowait((event['version'], message))
+                    break
+                except queue.Full:
+                    try:
+                        subscriber.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    def last_events(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._last.values())
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'subscribers': len(self._subscribers), 'events': self._published}
+
+
+BROKER = EventBroker(MAX_QUEUED_EVENTS)
+
+
+def diff_snapshots(old: DatasetSnapshot, new: DatasetSnapshot) -> Dict[str, Any]:
+    """
+    Builds the event announcing a new version of a dataset.
+
+    Rows are matched on their detail key (drug name and approval date, see utils.ingest.build_detail_index).
+
+    Args:
+        old (DatasetSnapshot): The snapshot which was replaced.
+        new (DatasetSnapshot): The new snapshot.
+
+    Returns:
+        Dict[str, Any]: The data type and version of the new snapshot, the rows it adds (at most MAX_NOTIFIED_ROWS,
+        with their total number) and the years whose rows were added or removed. 'years' is None when the
+        snapshots cannot be compared, i.e. every year may have changed.
+    """
+
+    event: Dict[str, Any] = {'data_type': new.data_type, 'version': new.version, 'added': [], 'n_added': 0}
+    old_details, new_details = old.derived.get('details'), new.derived.get('details')
+    if old_details is None or new_details is None:
+        return {**event, 'years': None}
+
+    added = [position for key, position in new_details.items() if key not in old_details]
+    removed = [position for key, position in old_details.items() if key not in new_details]
+
+    rows = new.data.iloc[added[:MAX_NOTIFIED_ROWS]][NOTIFIED_COLUMNS]
+    rows = rows.astype({'year': 'Int64'}).astype(object)
+    years = set(new.data['year'].iloc[added].dropna()) | set(old.data['year'].iloc[removed].dropna())
+
+    return {
+        **event,
+        'added': rows.where(rows.notna(), None).to_dict('records'),
+        'n_added': len(added),
+        'years': sorted(int(year) for year in years),
+    }
+
+
+def notify_new_snapshot(old: DatasetSnapshot, new: DatasetSnapshot) -> None:
+    event = diff_snapshots(old, new)
+    logging.info(f'[+] Notifying version {new.version} of {new.data_type}: {event["n_added"]} rows added')
+    BROKER.publish(event)
+
+
+def _format_event(version: str, message: str) -> str:
+    return f'id: {version}\ndata: {message}\n\n'
+
+
+def _stream(last_version: Optional[str]) -> Iterator[str]:
+    subscriber = BROKER.subscribe()
+    try:
+        yield f'retry: {HEARTBEAT_INTERVAL * 1000}\n\n'
+
+        # A client reconnecting after a missed version is told to refresh everything
+        if last_version is not None:
+            for event in BROKER.last_events():
+                if event['version'] != last_version:
+                    missed = {**event, 'added': [], 'n_added': 0, 'years': None}
+                    yield _format_event(event['version'], json.dumps(missed))
+
+        deadline = time.monotonic() + STREAM_LIFETIME
+        while time.monotonic() < deadline:
+            try:
+                version, message = subscriber.get(timeout=HEARTBEAT_INTERVAL)
+            except queue.Empty:
+                yield ': keep-alive\n\n'
+                continue
+            yield _format_event(version, message)
+    finally:
+        BROKER.unsubscribe(subscriber)
+
+
+def init_notifications(app) -> None:
+    """
+    Pushes the new versions of the datasets to the open dashboards with server-sent events. Does nothing when
+    notifications are disabled (CONFIG.NOTIFICATIONS_ENABLED).
+
+    Each time a new version replaces the cached snapshot (see utils.loading_data.refresh_snapshot), an event with
+    its version, its added rows and the years it changes is sent to the clients connected to
+    CONFIG.NOTIFICATIONS_PATH. Each gunicorn worker notifies its own clients, once its watcher has loaded the new
+    version. Every client holds a connection, so the workers should be threaded (`--threads`).
+
+    Args:
+        app (dash.Dash): The Dash app.
+    """
+
+    if not CONFIG.NOTIFICATIONS_ENABLED:
+        return
+
+    from utils.loading_data import SNAPSHOT_LISTENERS
+
+    SNAPSHOT_LISTENERS.append(notify_new_snapshot)
+
+    @app.server.route(CONFIG.NOTIFICATIONS_PATH)
+    def dataset_events():
+        return flask.Response(
+            _stream(flask.request.headers.get('Last-Event-ID')),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+        )
@@ -0,0 +1,119 @@
+import cProfile
+import glob
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime
+from typing import Any, Dict
+
+import flask
+
+from config import CONFIG
+from utils.metrics import callback_name, callback_path
+
+# Number of profiles kept in CONFIG.PROFILING_DIR, the oldest are deleted first
+MAX_PROFILES = 100
+
+# Maximum length of the repr of each input value saved with a profile (Store contents can be large)
+MAX_INPUT_REPR = 200
+
+
+def _describe_inputs(body: Dict[str, Any]) -> Dict[str, str]:
+    described = {}
+    for item in body.get('inputs', []) + body.get('state', []):
+        if isinstance(item, dict) and 'id' in item:
+            described[f'{item["id"]}.{item["property"]}'] = repr(item.get('value'))[:MAX_INPUT_REPR]
+    return described
+
+
+def _prune_profiles(directory: str) -> None:
+    profiles = sorted(glob.glob(os.path.join(directory, '*.prof')), key=os.path.getmtime)
+    for path in profiles[:-MAX_PROFILES]:
+        for stale in (path, path[:-len('.prof')] + '.json'):
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+
+def save_profile(profiler: cProfile.Profile, name: str, duration: float, body: Dict[str, Any]) -> str:
+    """
+    Saves the profile of a callback invocation in CONFIG.PROFILING_DIR.
+
+    The profile is written as a pstats file, which snakeviz or flameprof turn into a flame graph, next to a JSON
+    file with the callback name, its outputs, its duration and the values of its inputs.
+
+    Args:
+        profiler (cProfile.Profile): The stopped profiler of the invocation.
+        name (str): Name of the callback.
+        duration (float): Duration of the invocation, in seconds.
+        body (Dict[str, Any]): The callback request.
+
+    Returns:
+        str: Path of the pstats file.
+    """
+
+    directory = CONFIG.PROFILING_DIR
+    os.makedirs(directory, exist_ok=True)
+
+    stem = f'{datetime.now():%Y%m%d-%H%M%S-%f}_{re.sub(r"[^A-Za-z0-9_-]+", "-", name)[:80]}_{duration * 1e3:.0f}ms'
+    path = os.path.join(directory, f'{stem}.prof')
+    profiler.dump_stats(path)
+    with open(os.path.join(directory, f'{stem}.json'), 'w') as f:
+        json.dump(
+            {
+                'callback': name,
+                'output': body.get('output'),
+                'duration_ms': duration * 1e3,
+                'inputs': _describe_inputs(body),
+            },
+            f,
+            indent=2
+        )
+
+    _prune_profiles(directory)
+    return path
+
+
+def init_profiling(app) -> None:
+    """
+    Profiles every callback request of a Dash app with cProfile and keeps the profiles of the invocations slower
+    than CONFIG.PROFILING_THRESHOLD_MS. Does nothing when profiling is disabled (CONFIG.PROFILING_ENABLED).
+
+    Args:
+        app (dash.Dash): The Dash app.
+    """
+
+    if not CONFIG.PROFILING_ENABLED:
+        return
+
+    server = app.server
+    threshold = float(CONFIG.PROFILING_THRESHOLD_MS) / 1e3
+
+    @server.before_request
+    def start_profiler():
+        if flask.request.path == callback_path(app):
+            profiler = cProfile.Profile()
+            flask.g.profiling = (profiler, time.perf_counter())
+            profiler.enable()
+
+    @server.after_request
+    def save_slow_profile(response: flask.Response) -> flask.Response:
+        profiling = flask.g.pop('profiling', None)
+        if profiling is None:
+            return response
+
+        profiler, start = profiling
+        profiler.disable()
+        duration = time.perf_counter() - start
+        if duration >= threshold:
+            body = flask.request.get_json(silent=True) or {}
+            name = callback_name(app, body.get('output', ''))
+            try:
+                path = save_profile(profiler, name, duration, body)
+                logging.info(f'[+] Slow callback {name} ({duration * 1e3:.0f} ms) profiled in {path}')
+            except OSError as e:
+                logging.warning(f'[+] Could not save the profile of {name}: {e}')
+        return response
@@ -0,0 +1,82 @@
+import json
+import logging
+from typing import Any
+
+import plotly.io.json as plotly_json
+from flask.json.provider import DefaultJSONProvider
+
+from config import CONFIG
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - the standard json module is used instead
+    orjson = None
+
+try:
+    from flask_compress import Compress
+except ImportError:  # pragma: no cover - responses are sent uncompressed
+    Compress = None
+
+
+def _json_engine() -> str:
+    engine = CONFIG.JSON_ENGINE
+    if engine == 'orjson' and orjson is None:
+        logging.warning('[+] orjson is not installed, falling back to the json module')
+        return 'json'
+    return engine
+
+
+# Engine used for every JSON (de)serialisation of the app: 'orjson' or 'json'
+JSON_ENGINE = _json_engine()
+
+
+def loads(data: Any) -> Any:
+    """
+    Parses a JSON string or bytes with the configured engine.
+    """
+    if JSON_ENGINE == 'orjson':
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider parsing request bodies, such as the Store contents sent back with each callback
+    request, with orjson.
+    """
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+
+def init_serialisation(app) -> None:
+    """
+    Configures how the responses of a Dash app are serialised and compressed.
+
+    Callback responses and figures are serialised by plotly's JSON encoder, which is switched to orjson (it
+    handles NumPy arrays and pandas timestamps natively) when CONFIG.JSON_ENGINE is 'orjson'. Request bodies are
+    parsed with the same engine. When CONFIG.COMPRESSION_ENABLED is set, responses larger than
+    CONFIG.COMPRESSION_MIN_SIZE bytes (callbacks, layout, assets) are compressed with the first algorithm of
+    CONFIG.COMPRESSION_ALGORITHMS accepted by the browser.
+
+    Args:
+        app (dash.Dash): The Dash app.
+    """
+
+    server = app.server
+
+    plotly_json.config.default_engine = JSON_ENGINE
+    if JSON_ENGINE == 'orjson':
+        server.json = OrjsonProvider(server)
+
+    if not CONFIG.COMPRESSION_ENABLED:
+        return
+    if Compress is None:
+        logging.warning('[+] flask-compress is not installed, responses are sent uncompressed')
+        return
+
+    server.config['COMPRESS_ALGORITHM'] = [
+        algorithm.strip() for algorithm in CONFIG.COMPRESSION_ALGORITHMS.split(',') if algorithm.strip()
+    ]
+    server.config['COMPRESS_MIN_SIZE'] = int(CONFIG.COMPRESSION_MIN_SIZE)
+    Compress(server)
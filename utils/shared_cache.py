@@ -0,0 +1,129 @@
+import logging
+import os
+import sqlite3
+import stat
+import threading
+import time
+from typing import Dict, Optional
+
+from config import CONFIG
+
+
+def check_private(path: str) -> None:
+    """
+    Checks that the cache file and its directory can only be changed by the user running the app: the directory
+    must belong to that user and not be writable by others, and the file, if it exists, must belong to that user
+    and not be a symbolic link.
+
+    Raises:
+        PermissionError: If another user could create, replace or change the cache file.
+    """
+
+    if not hasattr(os, 'getuid'):
+        return
+
+    uid = os.getuid()
+    directory = os.path.dirname(os.path.abspath(path))
+    directory_stat = os.stat(directory)
+    if directory_stat.st_uid != uid or directory_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(f'{directory} must belong to the user running the app and not be writable by others')
+
+    try:
+        file_stat = os.lstat(path)
+    except FileNotFoundError:
+        return
+    if file_stat.st_uid != uid or stat.S_ISLNK(file_stat.st_mode):
+        raise PermissionError(f'{path} must be a file belonging to the user running the app')
+
+
+class SQLiteCache:
+    """
+    Key-value cache stored in a local SQLite file, shared by all the processes of a host (e.g. gunicorn workers).
+
+    Entries expire after a TTL and are tagged with the dataset version they were computed from. The first time a
+    process writes an entry for a new version, the entries of every other version are deleted.
+    """
+
+    def __init__(self, path: str, ttl: float):
+        """
+        Args:
+            path (str): Path of the SQLite file, created if needed. Its directory is created private (mode 0700).
+            ttl (float): Lifetime of the entries, in seconds.
+
+        Raises:
+            PermissionError: If the file or its directory could be changed by another user (see check_private).
+        """
+
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._last_version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        check_private(path)
+
+        with self._connection() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, version TEXT NOT NULL, expires_at REAL NOT NULL)'
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections cannot be shared between threads or forked processes, so each thread of each
+        # process opens its own
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            row = self._connection().execute(
+                'SELECT value FROM cache WHERE key = ? AND expires_at > ?', (key, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            logging.warning(f'[+] Shared cache read failed: {e}')
+            row = None
+
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def set(self, key: str, value: bytes, version: str) -> None:
+        try:
+            with self._connection() as conn:
+                if version != self._last_version:
+                    conn.execute('DELETE FROM cache WHERE version != ? OR expires_at <= ?', (version, time.time()))
+                    self._last_version = version
+                conn.execute(
+                    'INSERT OR REPLACE INTO cache (key, value, version, expires_at) VALUES (?, ?, ?, ?)',
+                    (key, value, version, time.time() + self.ttl)
+                )
+        except sqlite3.Error as e:
+            logging.warning(f'[+] Shared cache write failed: {e}')
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the hit/miss counters of this process.
+        """
+
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+# Shared cache of the process, None when disabled (SHARED_CACHE_ENABLED)
+SHARED_CACHE: Optional[SQLiteCache] = None
+if CONFIG.SHARED_CACHE_ENABLED:
+    try:
+        SHARED_CACHE = SQLiteCache(CONFIG.SHARED_CACHE_PATH, float(CONFIG.SHARED_CACHE_TTL))
+    except PermissionError as e:
+        logging.warning(f'[+] Shared cache disabled: {e}')
@@ -0,0 +1,95 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from utils.tracing import span
+
+
+class _Flight:
+    """
+    A computation in progress, and its outcome once it is done.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.duration = 0.0
+
+
+class SingleFlight:
+    """
+    Runs at most one computation per key at a time in the process: callers asking for a key which is already
+    being computed wait for that computation and share its result (or its exception) instead of repeating it.
+
+    Nothing is kept once a computation is done, the results are cached by the callers (year views, figure cache).
+    This only covers the window during which a result is being computed, e.g. the first requests for a view after
+    a new dataset version, or many users opening the same view at once.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.shared = 0
+        self.saved_seconds = 0.0
+
+    def do(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Returns the result of compute(), shared with the concurrent calls for the same key.
+
+        Args:
+            key (Hashable): Identifies the computation, and must include all of its inputs (e.g. the dataset version
+                and the year).
+            compute (Callable[[], Any]): The computation.
+
+        Returns:
+            Any: The result of the computation, which may have been run by another thread.
+        """
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.executions += 1
+
+        if not leader:
+            with span('single flight wait'):
+                flight.done.wait()
+            with self._lock:
+                self.shared += 1
+                self.saved_seconds += flight.duration
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        start = time.perf_counter()
+        try:
+            flight.result = compute()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            flight.duration = time.perf_counter() - start
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns the number of computations run, the number of calls which shared the result of another one, the
+        compute time those calls saved, and the number of computations in progress.
+        """
+
+        with self._lock:
+            return {
+                'executions': self.executions,
+                'shared': self.shared,
+                'saved_seconds': round(self.saved_seconds, 6),
+                'in_flight': len(self._flights),
+            }
+
+
+SINGLE_FLIGHT = SingleFlight()
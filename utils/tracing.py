@@ -0,0 +1,292 @@
+import functools
+import html
+import itertools
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import flask
+
+from config import CONFIG
+from utils.metrics import callback_name, callback_path
+
+# Number of traces kept in memory by each process, the oldest are dropped first
+MAX_TRACES = 100
+
+# Cookie tying the callback requests of a page view to its trace
+TRACE_COOKIE = 'trace_id'
+
+# Colours of the spans in the waterfall, by span name
+SPAN_COLOURS = {
+    'request': '#9aa5b1',
+    'callback': '#3e7cb1',
+    'data load': '#e07a5f',
+    'read': '#f2a65a',
+    'parse': '#f2cc8f',
+    'dataframe': '#81b29a',
+    'aggregation': '#3d405b',
+    'figure build': '#9b5de5',
+    'single flight wait': '#adb5bd',
+    'serialisation': '#f15bb5',
+}
+
+
+@dataclass
+class Span:
+    """
+    A timed operation of a trace.
+
+    Attributes:
+        span_id (int): Identifier of the span in its trace.
+        parent_id (Optional[int]): Identifier of the enclosing span, None for the request spans.
+        name (str): Kind of operation: 'request', 'callback', 'data load', 'dataframe', 'aggregation',
+            'figure build', 'serialisation', ...
+        start (float): Start time (epoch, in seconds).
+        end (Optional[float]): End time, None while the span is open.
+        attributes (Dict[str, Any]): Details of the operation, e.g. the callback name of a request span.
+    """
+    span_id: int
+    parent_id: Optional[int]
+    name: str
+    start: float
+    end: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+
+class Trace:
+    """
+    The spans of a page view: the layout request, then every callback request of the chain it triggers.
+    """
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List[Span] = []
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def start_span(self, name: str, parent_id: Optional[int], **attributes: Any) -> Span:
+        span = Span(next(self._ids), parent_id, name, time.time(), attributes=attributes)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the trace with span times in milliseconds from its first span, and the duration of its critical
+        path: from the first request to the end of the last one.
+        """
+
+        with self._lock:
+            spans = [span for span in self.spans if span.end is not None]
+        if not spans:
+            return {'trace_id': self.trace_id, 'duration_ms': 0, 'spans': []}
+
+        origin = min(span.start for span in spans)
+        return {
+            'trace_id': self.trace_id,
+            'started_at': origin,
+            'duration_ms': (max(span.end for span in spans) - origin) * 1e3,
+            'spans': [
+                {
+                    'span_id': span.span_id,
+                    'parent_id': span.parent_id,
+                    'name': span.name,
+                    'start_ms': (span.start - origin) * 1e3,
+                    'duration_ms': (span.end - span.start) * 1e3,
+                    'attributes': span.attributes,
+                }
+                for span in sorted(spans, key=lambda span: (span.start, span.span_id))
+            ],
+        }
+
+
+class TraceStore:
+    """
+    Bounded, thread-safe store of the recent traces of the process.
+    """
+
+    def __init__(self, max_traces: int):
+        self.max_traces = max_traces
+        self._traces: 'OrderedDict[str, Trace]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(self, trace_id: str) -> Trace:
+        with self._lock:
+            trace = self._traces.get(trace_id)
+            if trace is None:
+                trace = self._traces[trace_id] = Trace(trace_id)
+                while len(self._traces) > self.max_traces:
+                    self._traces.popitem(last=False)
+            return trace
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        with self._lock:
+            return self._traces.get(trace_id)
+
+    def list(self) -> List[Trace]:
+        with self._lock:
+            return list(reversed(self._traces.values()))
+
+
+TRACES = TraceStore(MAX_TRACES)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[None]:
+    """
+    Records a span nested in the current span of the request, when the request is traced. Does nothing outside
+    a traced request (tracing disabled, request without a trace id, background thread).
+    """
+
+    if not CONFIG.TRACING_ENABLED or not flask.has_request_context():
+        yield
+        return
+
+    stack: Optional[List[Span]] = flask.g.get('trace_stack')
+    if not stack:
+        yield
+        return
+
+    current = flask.g.trace.start_span(name, stack[-1].span_id, **attributes)
+    stack.append(current)
+    try:
+        yield
+    finally:
+        current.end = time.time()
+        stack.pop()
+
+
+def traced(func: Callable) -> Callable:
+    """
+    Records a 'callback' span around a callback function. The time between its end and the end of the request
+    is recorded as the 'serialisation' span of the response.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with span('callback', function=func.__name__):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def render_waterfall(trace: Dict[str, Any]) -> str:
+    """
+    Renders a trace (see Trace.to_dict) as a standalone HTML waterfall, one row per span.
+    """
+
+    total = trace['duration_ms'] or 1
+    depths: Dict[int, int] = {}
+    rows = []
+    for item in trace['spans']:
+        depth = depths[item['span_id']] = depths.get(item['parent_id'], -1) + 1
+        label = item['name']
+        if 'callback' in item['attributes']:
+            label = f'{label}: {item["attributes"]["callback"]}'
+        colour = SPAN_COLOURS.get(item['name'], '#6c757d')
+        rows.append(
+            f'<tr><td style="padding-left:{depth * 16}px">{html.escape(label)}</td>'
+            f'<td class="bar"><div style="margin-left:{item["start_ms"] / total * 100:.3f}%;'
+            f'width:{max(item["duration_ms"] / total * 100, 0.2):.3f}%;background:{colour}"></div></td>'
+            f'<td>{item["start_ms"]:.1f}</td><td>{item["duration_ms"]:.1f}</td></tr>'
+        )
+
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8">'
+        f'<title>Trace {html.escape(trace["trace_id"])}</title><style>'
+        'body{font-family:sans-serif;font-size:13px}table{border-collapse:collapse;width:100%}'
+        'td{padding:2px 6px;white-space:nowrap}tr:nth-child(even){background:#f5f5f5}'
+        'td.bar{width:60%}td.bar div{height:12px;border-radius:2px}'
+        '</style></head><body>'
+        f'<h3>Trace {html.escape(trace["trace_id"])}: {trace["duration_ms"]:.1f} ms to the end of the last '
+        'request</h3><table><tr><th>span</th><th></th><th>start (ms)</th><th>duration (ms)</th></tr>'
+        + ''.join(rows)
+        + '</table></body></html>'
+    )
+
+
+def init_tracing(app) -> None:
+    """
+    Traces the page views of a Dash app. Does nothing when tracing is disabled (CONFIG.TRACING_ENABLED).
+
+    Each request of the layout starts a trace, whose id is set in a cookie so that the callback requests of the
+    page view are recorded in the same trace. Traces are kept in the memory of each process and served on
+    CONFIG.TRACING_PATH: the list of recent traces, then each trace as JSON (`/<trace id>.json`) or as an HTML
+    waterfall (`/<trace id>.html`). With several gunicorn workers, a trace only holds the requests answered by
+    the worker which serves it.
+
+    Args:
+        app (dash.Dash): The Dash app.
+    """
+
+    if not CONFIG.TRACING_ENABLED:
+        return
+
+    server = app.server
+    layout_path = f'{app.config.routes_pathname_prefix}_dash-layout'
+
+    @server.before_request
+    def start_request_span():
+        path = flask.request.path
+        if path == layout_path:
+            trace_id = uuid.uuid4().hex[:16]
+        elif path == callback_path(app):
+            trace_id = flask.request.cookies.get(TRACE_COOKIE)
+        else:
+            return
+        if not trace_id:
+            return
+
+        trace = TRACES.get_or_create(trace_id)
+        flask.g.trace = trace
+        flask.g.trace_stack = [trace.start_span('request', None, path=path)]
+
+    @server.after_request
+    def end_request_span(response: flask.Response) -> flask.Response:
+        stack = flask.g.pop('trace_stack', None)
+        if not stack:
+            return response
+
+        trace, request_span = flask.g.trace, stack[0]
+        now = time.time()
+
+        if flask.request.path == callback_path(app):
+            body = flask.request.get_json(silent=True) or {}
+            request_span.attributes['callback'] = callback_name(app, body.get('output', ''))
+            callback_spans = [
+                item for item in trace.spans if item.parent_id == request_span.span_id and item.name == 'callback'
+            ]
+            if callback_spans and callback_spans[-1].end is not None:
+                serialisation = trace.start_span('serialisation', request_span.span_id, part='response')
+                serialisation.start, serialisation.end = callback_spans[-1].end, now
+
+        request_span.attributes.update(status=response.status_code, bytes=response.calculate_content_length())
+        request_span.end = now
+        response.headers['X-Trace-Id'] = trace.trace_id
+        if flask.request.path == layout_path:
+            response.set_cookie(TRACE_COOKIE, trace.trace_id, httponly=True, samesite='Lax')
+        return response
+
+    @server.route(CONFIG.TRACING_PATH)
+    def list_traces():
+        return flask.jsonify([
+            {
+                'trace_id': trace['trace_id'],
+                'duration_ms': trace['duration_ms'],
+                'requests': sum(item['name'] == 'request' for item in trace['spans']),
+            }
+            for trace in (trace.to_dict() for trace in TRACES.list())
+        ])
+
+    @server.route(f'{CONFIG.TRACING_PATH}/<trace_id>.<export_format>')
+    def export_trace(trace_id: str, export_format: str):
+        trace = TRACES.get(trace_id)
+        if trace is None or export_format not in ('json', 'html'):
+            flask.abort(404)
+        if export_format == 'json':
+            return flask.jsonify(trace.to_dict())
+        return flask.Response(render_waterfall(trace.to_dict()), mimetype='text/html')
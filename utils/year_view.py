@@ -0,0 +1,236 @@
+from datetime import datetime
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Tuple
+
+from pandas import DataFrame
+from plotly.io.json import to_json_plotly
+
+from utils.aggregations import ApprovalsCube
+from utils.grid_blocks import sort_rows
+from utils.data_store import (
+    StorePayload,
+    decode_columnar,
+    encode_columnar,
+    is_handle,
+    resolve_snapshot,
+    resolve_store_payload,
+)
+from utils.serialisation import loads
+from utils.shared_cache import SHARED_CACHE
+from utils.single_flight import SINGLE_FLIGHT
+from utils.tracing import span
+
+# Columns shown in the KPI panel, in display order
+KPI_COLUMNS = ['Company', 'disease_type', 'drug_type']
+
+# Number of drug types shown in the drug type chart
+N_DRUG_TYPES = 5
+
+
+@dataclass(frozen=True, eq=False)
+class YearView:
+    """
+    Everything the dashboard displays for a year, computed in one pass.
+
+    Attributes:
+        version (Optional[str]): Version of the dataset snapshot, None when the view was built from records.
+        year (Optional[int]): The year of the view, None when the view covers all the data it was built from.
+        total (int): Number of approvals.
+        top_items (Dict[str, Optional[Tuple[str, str]]]): Full and short labels of the top item of each KPI
+            column, None if the year has no approvals.
+        monthly (DataFrame): Approvals per month ('Date of Approval', 'total').
+        drug_types (DataFrame): Top drug types ('drug_type', 'total').
+        grid_frame (DataFrame): Rows of the approvals grid, most recent first.
+        cube (ApprovalsCube): The cube the view was read from, used for the company chart.
+    """
+    version: Optional[str]
+    year: Optional[int]
+    total: int
+    top_items: Dict[str, Optional[Tuple[str, str]]]
+    monthly: DataFrame
+    drug_types: DataFrame
+    grid_frame: DataFrame
+    cube: ApprovalsCube
+    _sorted_grids: Dict[tuple, DataFrame] = field(default_factory=dict, init=False, repr=False)
+
+    @cached_property
+    def grid_rows(self) -> List[Dict[str, Any]]:
+        """
+        Returns all the rows of the approvals grid, for the client-side row model.
+        """
+        with span('serialisation', part='grid rows'):
+            return self.grid_frame.to_dict('records')
+
+    def sorted_grid(self, key: tuple) -> DataFrame:
+        """
+        Returns the rows of the approvals grid sorted by a sort key (see utils.grid_blocks.sort_key), for the
+        infinite row model. Each sort order is computed once per view.
+        """
+        frame = self._sorted_grids.get(key)
+        if frame is None:
+            with span('dataframe', part='grid sort'):
+                frame = self._sorted_grids[key] = sort_rows(self.grid_frame, key)
+        return frame
+
+    def cache_key(self, name: str, *inputs: Any) -> Optional[tuple]:
+        """
+        Returns the key of a figure of this view in the figure cache, None if the view cannot be cached.
+        """
+        if self.version is None:
+            return None
+        return name, self.version, self.year, *inputs
+
+    def item_per_company(self, item_type: str, n_companies: int) -> Tuple[DataFrame, List[str]]:
+        """
+        Returns the approvals of the top N companies of the year, split by drug or disease type.
+        """
+        with span('aggregation'):
+            return self.cube.item_per_company(item_type, n_companies, self.year)
+
+
+def build_year_view(
+        df: DataFrame,
+        cube: ApprovalsCube,
+        year: Optional[int],
+        version: Optional[str] = None
+) -> YearView:
+    """
+    Computes the view of a year: the rows are filtered once and the aggregates are read from the cube.
+
+    Args:
+        df (DataFrame): The prepared dataset (see utils.ingest).
+        cube (ApprovalsCube): The aggregation cube of the dataset.
+        year (Optional[int]): The year to display, or None to use all the rows of `df`.
+        version (Optional[str]): Version of the dataset snapshot, if known.
+
+    Returns:
+        YearView: The view of the year.
+    """
+
+    with span('dataframe', part='year rows'):
+        df_year = df if year is None else df[df['year'] == year]
+        grid_frame = (
+            df_year[['approval_date', 'drug_name']]
+            .rename(columns={'approval_date': 'Date of Approval'})
+            .assign(Details='')
+            .reset_index(drop=True)
+        )
+
+    with span('aggregation'):
+        top_items: Dict[str, Optional[Tuple[str, str]]] = {}
+        for col in KPI_COLUMNS:
+            top_item = cube.top(col, year, n=1)
+            top_items[col] = None if top_item.empty else cube.labels(col, top_item.iloc[0][col])
+
+        return YearView(
+            version=version,
+            year=year,
+            total=cube.total(year),
+            top_items=top_items,
+            monthly=cube.monthly(year),
+            drug_types=cube.top('drug_type', year, n=N_DRUG_TYPES),
+            grid_frame=grid_frame,
+            cube=cube,
+        )
+
+
+def year_bounds(df: DataFrame) -> Tuple[int, int, int]:
+    """
+    Returns the first and last years of approval of the dataset, and the current year, the default selection of
+    the year input.
+    """
+    with span('aggregation', part='year bounds'):
+        return int(df['year'].min()), int(df['year'].max()), datetime.now().year
+
+
+def dump_view(view: YearView) -> bytes:
+    """
+    Serialises a view for the shared cache, as JSON with its frames encoded by encode_columnar. The cube is shared
+    by all the views of a version, so it is not stored with each of them.
+    """
+    return to_json_plotly({
+        'version': view.version,
+        'year': view.year,
+        'total': int(view.total),
+        'top_items': view.top_items,
+        'monthly': encode_columnar(view.monthly),
+        'drug_types': encode_columnar(view.drug_types),
+        'grid_frame': encode_columnar(view.grid_frame),
+    }).encode()
+
+
+def load_view(value: bytes, cube: ApprovalsCube) -> YearView:
+    """
+    Rebuilds a view serialised by dump_view, attached to the cube of its version.
+    """
+    payload = loads(value)
+    return YearView(
+        version=payload['version'],
+        year=payload['year'],
+        total=payload['total'],
+        top_items={col: tuple(items) if items is not None else None for col, items in payload['top_items'].items()},
+        monthly=decode_columnar(payload['monthly']),
+        drug_types=decode_columnar(payload['drug_types']),
+        grid_frame=decode_columnar(payload['grid_frame']),
+        cube=cube,
+    )
+
+
+def _load_or_build_view(df: DataFrame, cube: ApprovalsCube, year: int, version: str) -> YearView:
+    if SHARED_CACHE is None:
+        return build_year_view(df, cube, year, version)
+
+    key = repr(('year-view', version, year))
+    shared_value = SHARED_CACHE.get(key)
+    if shared_value is not None:
+        return load_view(shared_value, cube)
+
+    view = build_year_view(df, cube, year, version)
+    SHARED_CACHE.set(key, dump_view(view), version=version)
+    return view
+
+
+def get_year_view(payload: StorePayload) -> YearView:
+    """
+    Returns the view behind the content of the filtered Store.
+
+    For handles, views are memoised with their snapshot, so each (dataset version, year) is computed once per
+    process, concurrent requests for a view being computed waiting for it (see utils.single_flight). When the shared
+    cache is enabled, views computed by other workers are reused too. Columnar payloads and records ('columnar' and
+    'records' modes) already hold a single year and are aggregated on every call.
+
+    The year comes from the client, so only the years with approvals in the dataset are memoised: the views of the
+    other years are empty, cheap to build, and built on every call.
+
+    Args:
+        payload (StorePayload): Content of the 'filtered-drug-approvals-data' Store.
+
+    Returns:
+        YearView: The view of the selected year.
+    """
+
+    if is_handle(payload):
+        snapshot = resolve_snapshot(payload)
+        cube = snapshot.derived['cube']
+        year = payload['year']
+        if year not in cube.years:
+            return build_year_view(snapshot.data, cube, year, snapshot.version)
+
+        views: Dict[int, YearView] = snapshot.derived.setdefault('year_views', {})
+        view = views.get(year)
+        if view is None:
+            def compute() -> YearView:
+                # The view may have been stored by a computation which ended after the lookup above
+                if year not in views:
+                    views[year] = _load_or_build_view(snapshot.data, cube, year, snapshot.version)
+                return views[year]
+
+            view = SINGLE_FLIGHT.do(('year-view', snapshot.version, year), compute)
+        return view
+
+    with span('dataframe', part='records'):
+        df = resolve_store_payload(payload)
+    with span('aggregation', part='cube'):
+        cube = ApprovalsCube(df)
+    return build_year_view(df, cube, None)